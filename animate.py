@@ -1,150 +1,77 @@
-import matplotlib.pyplot as plt
-import matplotlib.path as mpath
-import matplotlib.patches as mpatches
-import matplotlib.transforms as transforms
-from matplotlib.patches import Rectangle
+import numpy as np
 
+from framelog import FrameLog
+from instrument import count, timed
+from street import (
+    classical_steps, k_naples_steps, interval_steps, unit_interval_steps
+)
+
+# matplotlib is imported on first draw, so pages that only simulate (and
+# app startup) never pay for it; pyplot only for plot_parking_state
+mpl = plt = mpath = mpatches = transforms = Rectangle = Figure = FigureCanvasAgg = None
+
+def _load_matplotlib(pyplot=False):
+    global mpl, plt, mpath, mpatches, transforms, Rectangle, Figure, FigureCanvasAgg
+    if Figure is None:
+        import matplotlib as mpl
+        import matplotlib.path as mpath
+        import matplotlib.patches as mpatches
+        import matplotlib.transforms as transforms
+        from matplotlib.patches import Rectangle
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+    if pyplot and plt is None:
+        import matplotlib.pyplot as plt
+
+@timed('simulate')
 def simulate_classical_parking(parking_func):
     """
     animation for classical PF_n; returns each frame of action taken
     """
-    n = len(parking_func)
-    frames = []
-    assignment = [None]*n
-    used_spots = set()
-    
-    # start with empty street
-    frames.append(assignment[:])
-    
-    for i, preferred in enumerate(parking_func):
-        spot = preferred
-        while spot in used_spots and spot <= n:
-            spot += 1
-        
-        # if no spot, car goes to end of street
-        if spot > n:
-            assignment[i] = None
-            frames.append(assignment[:])
-            break
-        else:
-            used_spots.add(spot)
-            assignment[i] = spot
-            frames.append(assignment[:])
-    
-    return frames
+    return FrameLog.from_steps(classical_steps(parking_func), len(parking_func))
 
+@timed('simulate')
 def simulate_k_naples_parking(parking_func, k):
     """
     animation for k-Naples PF_n
     """
-    n = len(parking_func)
-    frames = []
-    assignment = [None]*n
-    used_spots = set()
-    
-    frames.append(assignment[:])
-    
-    for i, preferred in enumerate(parking_func):
-        spot = preferred
-        
-        if spot in used_spots:
-            # try k steps back
-            for back_spot in range(spot-1, max(0, spot-k-1), -1):
-                if back_spot not in used_spots:
-                    spot = back_spot
-                    break
-            
-            # if no open spot, go to end of list
-            if spot in used_spots:
-                spot = preferred
-                while spot in used_spots and spot <= n:
-                    spot += 1
-        
-        # end of street
-        if spot > n:
-            assignment[i] = None
-            frames.append(assignment[:])
-            break
-        else:
-            used_spots.add(spot)
-            assignment[i] = spot
-            frames.append(assignment[:])
-    
-    return frames
+    return FrameLog.from_steps(k_naples_steps(parking_func, k), len(parking_func))
 
+@timed('simulate')
 def simulate_interval_parking(alpha, beta):
     """
     animation for l-interval PF_n
     """
-    n = len(alpha)
-    frames = []
-    assignment = [None]*n
-    used_spots = set()
-    
-    frames.append(assignment[:])
-    
-    for i in range(n):
-        # try each spot in interval [a_i, b_i]
-        parked = False
-        for spot in range(alpha[i], beta[i] + 1):
-            if spot not in used_spots:
-                assignment[i] = spot
-                used_spots.add(spot)
-                parked = True
-                break
-        
-        # end of street
-        if not parked:
-            assignment[i] = None
-            frames.append(assignment[:])
-        
-        frames.append(assignment[:])
-    
-    return frames
+    return FrameLog.from_steps(interval_steps(alpha, beta), len(alpha))
 
+@timed('simulate')
 def simulate_unit_interval_parking(alpha, beta):
     """
     animation for unit-interval PF_n
     """
-    n = len(alpha)
-    frames = []
-    assignment = [None]*n
-    used_spots = set()
-    
-    frames.append(assignment[:])
-    
-    for i in range(n):
-        # we can only park at a_i or b_i
-        parked = False
-        
-        # Try a_i first
-        if alpha[i] not in used_spots:
-            assignment[i] = alpha[i]
-            used_spots.add(alpha[i])
-            parked = True
-        # Then try b_i
-        elif beta[i] not in used_spots:
-            assignment[i] = beta[i]
-            used_spots.add(beta[i])
-            parked = True
-        
-        # parking fails 
-        if not parked:
-            assignment[i] = None
-            frames.append(assignment[:])
-            break  # stop animation
-        else:
-            frames.append(assignment[:])
-    
-    return frames
+    return FrameLog.from_steps(unit_interval_steps(alpha, beta), len(alpha))
 
-def draw_car(ax, x_left, y_bottom, width, height,
-             color='#63b6c8', label=None, label_size=10):
+# car glyph size within a spot
+CAR_WIDTH = 0.9
+CAR_HEIGHT = 0.4
+CAR_BOTTOM = 0.1
+PARKED_COLOR = '#5DADE2'
+WAITING_COLOR = 'lightblue'
+
+# level of detail: cars with wheels and labels up to DETAIL_MAX_SPOTS spots;
+# past that an occupancy strip colored by arrival order, with a close-up of
+# WINDOW_SPOTS spots around the current car
+DETAIL_MAX_SPOTS = 30
+WINDOW_SPOTS = 24
+STRIP_FIGSIZE = (12, 2.6)
+EMPTY_COLOR = 'lightgray'
+CURRENT_COLOR = '#E74C3C'
+
+def car_outline(width, height):
     """
-    creates cars for the animation
+    car_glyph's geometry as plain numbers: outline vertices, wheel centers,
+    wheel radius and label position relative to the car's bottom-left corner
     """
-    Path = mpath.Path
-    
     # wehhls
     wheel_radius = 0.12 * height
     car_body_height = height - 2*wheel_radius
@@ -163,6 +90,23 @@ def draw_car(ax, x_left, y_bottom, width, height,
         (0.0, wheel_radius + 0.7*car_body_height),
         (0.0, wheel_radius)
     ]
+    vertices = [(x_offset + x, y) for x, y in vertices]
+    
+    wheel_centers = [
+        (x_offset + 0.25*car_width, wheel_radius),
+        (x_offset + 0.75*car_width, wheel_radius),
+    ]
+    label_position = (x_offset + car_width/2, wheel_radius + 0.5*car_body_height)
+    return vertices, wheel_centers, wheel_radius, label_position
+
+def car_glyph(width, height):
+    """
+    car outline, wheel centers, wheel radius and label position relative to
+    the car's bottom-left corner
+    """
+    _load_matplotlib()
+    Path = mpath.Path
+    vertices, wheel_centers, wheel_radius, label_position = car_outline(width, height)
     codes = [
         Path.MOVETO,
         Path.LINETO,
@@ -172,10 +116,18 @@ def draw_car(ax, x_left, y_bottom, width, height,
         Path.LINETO,
         Path.CLOSEPOLY
     ]
-    car_path = Path(vertices, codes)
+    return Path(vertices, codes), wheel_centers, wheel_radius, label_position
+
+def draw_car(ax, x_left, y_bottom, width, height,
+             color='#63b6c8', label=None, label_size=10):
+    """
+    creates cars for the animation
+    """
+    _load_matplotlib()
+    car_path, wheel_centers, wheel_radius, (label_x, label_y) = car_glyph(width, height)
     
     # translate
-    t = transforms.Affine2D().translate(x_left + x_offset, y_bottom)
+    t = transforms.Affine2D().translate(x_left, y_bottom)
     car_path = t.transform_path(car_path)
     
     # draw body
@@ -183,16 +135,14 @@ def draw_car(ax, x_left, y_bottom, width, height,
     ax.add_patch(car_patch)
     
     # add wheels 
-    front_wheel_center = (x_left + x_offset + 0.25*car_width, y_bottom + wheel_radius)
-    back_wheel_center = (x_left + x_offset + 0.75*car_width, y_bottom + wheel_radius)
-    ax.add_patch(mpatches.Circle(front_wheel_center, wheel_radius, facecolor='black'))
-    ax.add_patch(mpatches.Circle(back_wheel_center, wheel_radius, facecolor='black'))
+    for wheel_x, wheel_y in wheel_centers:
+        ax.add_patch(mpatches.Circle((x_left + wheel_x, y_bottom + wheel_y), wheel_radius, facecolor='black'))
     
     # add label
     if label is not None:
         ax.text(
-            x_left + x_offset + car_width/2,
-            y_bottom + wheel_radius + 0.5*car_body_height,
+            x_left + label_x,
+            y_bottom + label_y,
             label,
             ha='center', va='center',
             fontsize=label_size,
@@ -200,28 +150,42 @@ def draw_car(ax, x_left, y_bottom, width, height,
             fontweight='bold'
         )
 
-def plot_parking_state(parking_func, assignment, current_step):
+def street_layout(n):
     """
-    plots a single frame of the parking state.
+    x and y limits of the street's axes, where spot 1 is centered and the
+    spacing between spots
     """
-    n = len(parking_func)
-    
-    fig, ax = plt.subplots(figsize=(max(12, n*1.5), 4))
-    
-    # axes
     left_bound, right_bound = -3, n + 2.5
-    ax.set_xlim(left_bound, right_bound)
-    ax.set_ylim(-0.2, 1.2)
-    ax.axis('off')
     
     # center spots
     spot_spacing = 1.2
     axis_midpoint = (left_bound + right_bound) / 2
     total_spots_width = (n - 1) * spot_spacing
     spot_start = axis_midpoint - (total_spots_width / 2)
+    return (left_bound, right_bound), (-0.2, 1.2), spot_start, spot_spacing
+
+def draw_street(ax, n, spots=None):
+    """
+    sets up the axes and draws the n empty spots, or only the spots in
+    (first, last) with the view cut down to them; returns where spot 1 is
+    centered and the spacing between spots
+    """
+    _load_matplotlib()
+    # axes
+    xlim, ylim, spot_start, spot_spacing = street_layout(n)
+    first, last = (1, n) if spots is None else spots
+    if spots is not None:
+        # keep the margins only at the real ends of the street
+        xlim = (
+            xlim[0] if first == 1 else spot_start + (first - 1.5)*spot_spacing,
+            xlim[1] if last == n else spot_start + (last - 0.5)*spot_spacing,
+        )
+    ax.set_xlim(*xlim)
+    ax.set_ylim(*ylim)
+    ax.axis('off')
     
     # draw spots
-    for spot_id in range(1, n + 1):
+    for spot_id in range(first, last + 1):
         x_pos = spot_start + (spot_id - 1) * spot_spacing
         ax.add_patch(
             Rectangle((x_pos - 0.4, 0.1), 0.8, 0.6,
@@ -232,39 +196,254 @@ def plot_parking_state(parking_func, assignment, current_step):
             ha='center', va='top', fontsize=8
         )
     
-    # car
-    car_width = 0.9
-    car_height = 0.4
+    return spot_start, spot_spacing
+
+def car_left_edge(n, spot, spot_start, spot_spacing):
+    """
+    x of a car's left edge in a spot; None puts it past the end of the street
+    """
+    if spot is None:
+        return (n + 1.5) - (CAR_WIDTH / 2)
+    return spot_start + (spot - 1)*spot_spacing - (CAR_WIDTH / 2)
+
+def level_of_detail(n):
+    """
+    'cars' for streets short enough to draw every car, else 'strip'
+    """
+    return 'cars' if n <= DETAIL_MAX_SPOTS else 'strip'
+
+def street_window(n, center, window=WINDOW_SPOTS):
+    """
+    first and last spot of `window` spots around center, kept inside 1..n
+    """
+    first = min(max(1, center - window // 2), max(1, n - window + 1))
+    return first, min(n, first + window - 1)
+
+def current_spot(assignment, current_step, n):
+    """
+    where the last car to move went; spot 1 before any car, n if it failed
+    """
+    if current_step == 0:
+        return 1
+    spot = assignment[current_step - 1]
+    return n if spot is None else spot
+
+@timed('plot_parking_state')
+def plot_parking_state(parking_func, assignment, current_step, detail=None, window=None):
+    """
+    plots a single frame of the parking state. detail is 'cars' or 'strip'
+    (chosen by n when None); window limits the drawing to that many spots
+    around the current car
+    """
+    _load_matplotlib(pyplot=True)
+    n = len(parking_func)
+    detail = detail or level_of_detail(n)
+    
+    if detail == 'strip':
+        fig = plt.figure(figsize=STRIP_FIGSIZE)
+        StripRenderer(parking_func, window=window or WINDOW_SPOTS, figure=fig).update(assignment, current_step)
+        return fig
+    
+    spots = None
+    if window is not None:
+        spots = street_window(n, current_spot(assignment, current_step, n), window)
+    fig, ax = plt.subplots(figsize=(max(12, (n if spots is None else window)*1.5), 4))
+    spot_start, spot_spacing = draw_street(ax, n, spots=spots)
     
+    # car
     if current_step < len(assignment) and assignment[current_step] is not None:
-        x_left = -2.5
-        y_bottom = 0.1
         draw_car(
-            ax, x_left, y_bottom,
-            car_width, car_height,
-            color='lightblue',
+            ax, -2.5, CAR_BOTTOM,
+            CAR_WIDTH, CAR_HEIGHT,
+            color=WAITING_COLOR,
             label=fr"$c_{{{current_step + 1}}}$"
         )
 
     for i in range(current_step):
-        spot = assignment[i]
-        if spot is not None:
-            x_left = spot_start + (spot - 1)*spot_spacing - (car_width / 2)
-            y_bottom = 0.1
-            draw_car(
-                ax, x_left, y_bottom,
-                car_width, car_height,
-                color='#5DADE2',
-                label=fr"$c_{{{i + 1}}}$"
-            )
-        else:
-            x_left = (n + 1.5) - (car_width / 2)
-            y_bottom = 0.1
-            draw_car(
-                ax, x_left, y_bottom,
-                car_width, car_height,
-                color='#5DADE2',
-                label=fr"$c_{{{i + 1}}}$"
-            )
+        if spots is not None and assignment[i] is not None and not spots[0] <= assignment[i] <= spots[1]:
+            continue
+        draw_car(
+            ax, car_left_edge(n, assignment[i], spot_start, spot_spacing), CAR_BOTTOM,
+            CAR_WIDTH, CAR_HEIGHT,
+            color=PARKED_COLOR,
+            label=fr"$c_{{{i + 1}}}$"
+        )
     
     return fig
+
+class StreetRenderer:
+    """
+    renders frames for one street without rebuilding the figure: the spots
+    are drawn once and kept as a blit background, the car glyph is built once,
+    and every car owns a few artists that are only moved and recolored. cars
+    that already parked are folded into the background, so stepping forward
+    one car draws a constant number of artists
+    """
+    
+    def __init__(self, parking_func, dpi=100):
+        _load_matplotlib()
+        n = len(parking_func)
+        self.n = n
+        self.figure = Figure(figsize=(max(12, n*1.5), 4), dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+        self.spot_start, self.spot_spacing = draw_street(self.ax, n)
+        
+        self._glyph = car_glyph(CAR_WIDTH, CAR_HEIGHT)
+        self._cars = {}
+        
+        self.canvas.draw()
+        self._street = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._background = self._street
+        self._step = 0
+        self._placed = []
+    
+    def render(self, assignment, current_step):
+        """
+        draws one frame and returns it as an RGBA array
+        """
+        placed = [assignment[i] for i in range(current_step)]
+        if current_step == self._step + 1 and placed[:-1] == self._placed:
+            # one more car parked: add it to the saved background
+            count('frames_incremental')
+            self.canvas.restore_region(self._background)
+            self._draw_car(current_step - 1, self._parked_x(placed[-1]), PARKED_COLOR)
+            self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        elif current_step != self._step or placed != self._placed:
+            # anything else rebuilds the background from the empty street
+            count('frames_rebuilt')
+            self.canvas.restore_region(self._street)
+            for i, spot in enumerate(placed):
+                self._draw_car(i, self._parked_x(spot), PARKED_COLOR)
+            self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        else:
+            count('frames_reused')
+            self.canvas.restore_region(self._background)
+        self._step, self._placed = current_step, placed
+        
+        if current_step < len(assignment) and assignment[current_step] is not None:
+            self._draw_car(current_step, -2.5, WAITING_COLOR)
+        return np.asarray(self.canvas.buffer_rgba()).copy()
+    
+    def _parked_x(self, spot):
+        return car_left_edge(self.n, spot, self.spot_start, self.spot_spacing)
+    
+    def _draw_car(self, car, x_left, color):
+        offset, body, wheels, label = self._car_artists(car)
+        _, wheel_centers, _, (label_x, label_y) = self._glyph
+        
+        offset.clear().translate(x_left, CAR_BOTTOM)
+        body.set_facecolor(color)
+        for wheel, (wheel_x, wheel_y) in zip(wheels, wheel_centers):
+            wheel.set_center((x_left + wheel_x, CAR_BOTTOM + wheel_y))
+        label.set_position((x_left + label_x, CAR_BOTTOM + label_y))
+        
+        for artist in (body, *wheels, label):
+            self.ax.draw_artist(artist)
+    
+    def _car_artists(self, car):
+        if car not in self._cars:
+            car_path, _, wheel_radius, _ = self._glyph
+            offset = transforms.Affine2D()
+            body = mpatches.PathPatch(car_path, edgecolor='black', linewidth=1,
+                                      transform=offset + self.ax.transData, animated=True)
+            wheels = [mpatches.Circle((0, 0), wheel_radius, facecolor='black', animated=True)
+                      for _ in range(2)]
+            for artist in (body, *wheels):
+                self.ax.add_patch(artist)
+            label = self.ax.text(0, 0, fr"$c_{{{car + 1}}}$", ha='center', va='center',
+                                 fontsize=10, color='black', fontweight='bold', animated=True)
+            self._cars[car] = (offset, body, wheels, label)
+        return self._cars[car]
+
+class StripRenderer:
+    """
+    large-n frames in constant time: one image holds the whole street as an
+    occupancy strip colored by arrival order, and a second view of the same
+    image shows WINDOW_SPOTS spots around the current car with car numbers.
+    stepping forward one car changes one pixel of the strip and a fixed pool
+    of labels, whatever n is
+    """
+    
+    def __init__(self, parking_func, window=WINDOW_SPOTS, dpi=100, figure=None):
+        _load_matplotlib()
+        n = len(parking_func)
+        self.n = n
+        self.window = min(window, n)
+        self.figure = figure if figure is not None else Figure(figsize=STRIP_FIGSIZE, dpi=dpi)
+        self.canvas = self.figure.canvas if figure is not None else FigureCanvasAgg(self.figure)
+        overview, self.close_up = self.figure.subplots(2, 1, gridspec_kw={'height_ratios': [1, 2]})
+        
+        self._strip = np.full((1, n), np.nan)
+        cmap = mpl.colormaps['viridis'].with_extremes(bad=EMPTY_COLOR)
+        self._images = [
+            ax.imshow(self._strip, cmap=cmap, vmin=0, vmax=max(n - 1, 1), aspect='auto',
+                      interpolation='nearest', extent=(0.5, n + 0.5, 0, 1))
+            for ax in (overview, self.close_up)
+        ]
+        for ax in (overview, self.close_up):
+            ax.set_yticks([])
+        overview.set_xlim(0.5, n + 0.5)
+        overview.set_title(f"{n} spots, colored by arrival order (gray: empty)", fontsize=9)
+        self.close_up.xaxis.set_major_locator(mpl.ticker.MaxNLocator(integer=True))
+        
+        self._frame = overview.add_patch(Rectangle((0.5, 0), self.window, 1, fill=False,
+                                                   edgecolor=CURRENT_COLOR, linewidth=1.5))
+        self._marker = self.close_up.add_patch(Rectangle((0.5, 0), 1, 1, fill=False,
+                                                         edgecolor=CURRENT_COLOR, linewidth=2))
+        self._labels = [
+            self.close_up.text(0, 0.5, '', ha='center', va='center', fontsize=8, fontweight='bold')
+            for _ in range(self.window)
+        ]
+        self._step = 0
+        self._placed = []
+    
+    def update(self, assignment, current_step):
+        """
+        moves the artists to one frame; stepping forward through one
+        simulation touches a single spot, anything else (another step, or
+        another simulation at the same step) rebuilds the strip
+        """
+        placed = list(assignment[:current_step])
+        if current_step == self._step + 1 and placed[:-1] == self._placed:
+            count('frames_incremental')
+            self._park(current_step - 1, placed[-1])
+        elif current_step != self._step or placed != self._placed:
+            count('frames_rebuilt')
+            self._strip[:] = np.nan
+            for car, spot in enumerate(placed):
+                self._park(car, spot)
+        self._step, self._placed = current_step, placed
+        for image in self._images:
+            image.set_data(self._strip)
+        
+        spot = current_spot(assignment, current_step, self.n)
+        first, last = street_window(self.n, spot, self.window)
+        self.close_up.set_xlim(first - 0.5, last + 0.5)
+        self._frame.set_x(first - 0.5)
+        self._marker.set_x(spot - 0.5)
+        for label, spot_id in zip(self._labels, range(first, last + 1)):
+            car = self._strip[0, spot_id - 1]
+            label.set_position((spot_id, 0.5))
+            label.set_text('' if np.isnan(car) else str(int(car) + 1))
+            label.set_color('black' if car > 0.6*(self.n - 1) else 'white')
+    
+    def render(self, assignment, current_step):
+        """
+        draws one frame and returns it as an RGBA array
+        """
+        self.update(assignment, current_step)
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba()).copy()
+    
+    def _park(self, car, spot):
+        if spot is not None:
+            self._strip[0, spot - 1] = car
+
+def renderer_for(parking_func, dpi=100):
+    """
+    StreetRenderer or StripRenderer, by level of detail
+    """
+    if level_of_detail(len(parking_func)) == 'cars':
+        return StreetRenderer(parking_func, dpi=dpi)
+    return StripRenderer(parking_func, dpi=dpi)
@@ -0,0 +1,137 @@
+import hashlib
+import io
+import os
+from collections import OrderedDict
+from threading import Lock
+
+from animate import renderer_for
+from instrument import count, span
+
+# each frame stays up for a second, like the old per-frame loop
+FRAME_MS = 1000
+# part of every cache key: bump it when the renderer or the GIF encoding
+# changes, so the disk tier stops serving animations drawn the old way
+RENDER_VERSION = 1
+
+
+class AnimationCache:
+    """
+    bounded LRU of rendered animations; evicts least recently used entries
+    once the stored bytes pass max_bytes and, given disk_dir, keeps a copy of
+    every entry on disk so restarts and other replicas can reuse it
+    """
+
+    def __init__(self, max_bytes=64 * 2**20, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        if disk_dir is not None:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries or (
+            self.disk_dir is not None and os.path.exists(self._disk_path(key))
+        )
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        if self.disk_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        self._remember(key, data)
+        if self.disk_dir is not None:
+            # write then rename so readers never see half a file
+            path = self._disk_path(key)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def _remember(self, key, data):
+        # anything bigger than the whole budget only lives on disk
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self.nbytes += len(data)
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.gif")
+
+
+def cache_key(variant, preferences, k=None, alpha=None, beta=None):
+    """
+    stable key for one animation's inputs
+    """
+    parts = (
+        RENDER_VERSION,
+        variant,
+        tuple(preferences),
+        k,
+        None if alpha is None else tuple(alpha),
+        None if beta is None else tuple(beta),
+    )
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def render_gif(parking_func, frames, frame_ms=FRAME_MS):
+    """
+    renders every frame once into a single animated GIF that plays through
+    once and stops on the last frame
+    """
+    from PIL import Image
+
+    with span('render_frames', frames=len(frames)):
+        renderer = renderer_for(parking_func)
+        images = []
+        for step, frame in enumerate(frames):
+            rgb = Image.fromarray(renderer.render(frame, step)).convert('RGB')
+            images.append(rgb.quantize(colors=64))
+
+    with span('encode_gif'):
+        buffer = io.BytesIO()
+        images[0].save(buffer, format='GIF', save_all=True, append_images=images[1:],
+                       duration=frame_ms, optimize=True)
+    count('gif_bytes', buffer.tell())
+    return buffer.getvalue()
+
+
+def animation_gif(variant, parking_func, frames, k=None, alpha=None, beta=None):
+    """
+    animated GIF for a simulation, rendered only on a cache miss
+    """
+    key = cache_key(variant, parking_func, k=k, alpha=alpha, beta=beta)
+    data = ANIMATIONS.get(key)
+    if data is None:
+        count('cache_misses')
+        data = render_gif(parking_func, frames)
+        ANIMATIONS.put(key, data)
+    else:
+        count('cache_hits')
+    return data
+
+
+# shared by every session of the app; set PF_ANIMATION_CACHE_DIR for the disk tier
+ANIMATIONS = AnimationCache(disk_dir=os.environ.get("PF_ANIMATION_CACHE_DIR"))
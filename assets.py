@@ -0,0 +1,47 @@
+import io
+import os
+from threading import Lock
+
+# static images for st.image, prepared once per process and kept in memory.
+# given a path, st.image reads, decodes and downscales the file on every
+# rerun (the pictures under imgs/ are up to 2230 px wide); given bytes it
+# already fits, it only reads the header
+
+# st.image's own limit: anything wider is resized on every call
+MAX_WIDTH = 2 * 730
+
+_images = {}
+_lock = Lock()
+
+
+def static_image(path, max_width=MAX_WIDTH):
+    """
+    PNG bytes of an image file, scaled down to max_width; cached until the
+    file changes
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+    key = (path, max_width, os.path.getmtime(path))
+    data = _images.get(key)
+    if data is None:
+        data = _prepare(path, max_width)
+        with _lock:
+            for stale in [cached for cached in _images if cached[:2] == key[:2]]:
+                del _images[stale]
+            _images[key] = data
+    return data
+
+
+def _prepare(path, max_width):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        if image.width <= max_width:
+            with open(path, 'rb') as f:
+                return f.read()
+        # same resampling st.image would use, done once; light compression
+        # keeps the first request fast
+        height = int(image.height * max_width / image.width)
+        resized = image.resize((max_width, height), resample=Image.BILINEAR)
+    buffer = io.BytesIO()
+    resized.save(buffer, format='PNG', compress_level=1)
+    return buffer.getvalue()
@@ -0,0 +1,260 @@
+import numpy as np
+
+# spots live in bits 1..n of a uint64 per row
+MAX_SPOTS = 62
+CHUNK_ROWS = 1 << 18
+# wider streets (interval PFs only) keep a next-free table per row instead
+# of a bitmask; chunks then hold about this many spots
+CHUNK_SPOTS = CHUNK_ROWS * MAX_SPOTS
+
+ONE = np.uint64(1)
+
+
+def validate_classical(prefs, spots=True):
+    """
+    validates every row of prefs as a classical PF_n; returns (valid, assignment)
+    where assignment[r, i] is the spot car i parked in (0 if it never parked),
+    or None when spots=False and only the sorted criterion is checked
+    """
+    prefs = _as_rows(prefs)
+    if not spots:
+        n = prefs.shape[1]
+        sorted_prefs = np.sort(prefs, axis=1)
+        return (
+            np.all((sorted_prefs >= 1) & (sorted_prefs <= np.arange(1, n + 1)), axis=1),
+            None,
+        )
+    n = prefs.shape[1]
+    return _run(_first_fit, prefs, np.full_like(prefs, n), back=0, stop_on_failure=True)
+
+
+def validate_k_naples(prefs, k, spots=True):
+    """
+    validates every row of prefs as a k-Naples PF_n; returns (valid, assignment)
+    """
+    prefs = _as_rows(prefs)
+    n = prefs.shape[1]
+    valid, assignment = _run(_first_fit, prefs, np.full_like(prefs, n), back=k, stop_on_failure=True)
+    return valid, (assignment if spots else None)
+
+
+def validate_k_naples_l_interval(prefs, k, l, spots=True):
+    """
+    validates every row of prefs with k steps back and l steps forward, the
+    rules of parking_functions.iter_parking_functions; returns (valid, assignment)
+    """
+    prefs = _as_rows(prefs)
+    valid, assignment = _run(_first_fit, prefs, prefs.astype(np.int64) + l, back=k, stop_on_failure=True)
+    return valid, (assignment if spots else None)
+
+
+def validate_interval(alpha, beta):
+    """
+    validates every row pair of alpha/beta as an l-interval PF_n; like
+    simulate_interval_parking, later cars still park after one fails.
+    any n works: past MAX_SPOTS each row gets a union-find next-free table
+    """
+    alpha, beta = _as_rows(alpha, max_spots=None), _as_rows(beta, max_spots=None)
+    if alpha.shape != beta.shape:
+        raise ValueError("alpha and beta must have the same shape")
+    if alpha.shape[1] > MAX_SPOTS:
+        return _run(_next_free, alpha, beta)
+    return _run(_first_fit, alpha, beta, back=0, stop_on_failure=False)
+
+
+def validate_unit_interval(alpha, beta=None):
+    """
+    validates every row pair of alpha/beta as a unit-interval PF_n, each car
+    trying only a_i and then b_i; beta defaults to the page's p_i + 1
+    (p_i for the last car). a choice past spot n is not a spot, so a car
+    left with only b_i = n + 1 fails
+    """
+    alpha = _as_rows(alpha)
+    if beta is None:
+        beta = unit_interval_beta(alpha)
+    beta = _as_rows(beta)
+    if alpha.shape != beta.shape:
+        raise ValueError("alpha and beta must have the same shape")
+    return _run(_two_choice, alpha, beta)
+
+
+def unit_interval_beta(alpha):
+    """
+    b_i = a_i + 1 except for the last car, as on the unit-interval page
+    """
+    beta = np.array(alpha, dtype=np.int64, copy=True)
+    beta[..., :-1] += 1
+    return beta
+
+
+def first_fit_step(occupied, a, b, back, n):
+    """
+    spot the next car takes on every row's street (an occupancy bitmask),
+    given its preference 1 <= a <= n, the last spot b it may take (an empty
+    interval when b < a) and how far back it may look; 0 where it cannot park
+    """
+    free = ~occupied & _span(np.ones_like(a), np.full_like(a, n))
+    spot = np.where((a <= b) & ((free & (ONE << a.astype(np.uint64))) != 0), a, 0)
+    todo = spot == 0
+
+    if back:
+        behind = free & _span(np.maximum(1, a - back), a - 1)
+        hit = todo & (behind != 0)
+        spot = np.where(hit, _highest_bit(behind), spot)
+        todo &= ~hit
+
+    ahead = free & _span(a, np.minimum(b, n))
+    hit = todo & (ahead != 0)
+    return np.where(hit, _lowest_bit(ahead), spot)
+
+
+def spot_dtype(n):
+    """
+    smallest unsigned dtype that holds spots 0..n
+    """
+    return np.uint8 if n <= 0xFF else (np.uint16 if n <= 0xFFFF else np.uint32)
+
+
+def _as_rows(prefs, max_spots=MAX_SPOTS):
+    prefs = np.asarray(prefs)
+    if prefs.ndim != 2:
+        raise ValueError("expected a 2-D array with one preference tuple per row")
+    if not np.issubdtype(prefs.dtype, np.integer):
+        raise ValueError("preferences must be integers")
+    if max_spots is not None and prefs.shape[1] > max_spots:
+        raise ValueError(f"batch validation supports at most {max_spots} spots")
+    return prefs
+
+
+def _run(kernel, alpha, beta, **options):
+    """
+    runs a kernel over chunks of rows so temporaries stay bounded
+    """
+    rows, n = alpha.shape
+    valid = np.empty(rows, dtype=bool)
+    assignment = np.empty((rows, n), dtype=spot_dtype(n))
+    chunk = max(1, min(CHUNK_ROWS, CHUNK_SPOTS // max(n, 1)))
+    for start in range(0, rows, chunk):
+        stop = min(start + chunk, rows)
+        valid[start:stop], assignment[start:stop] = kernel(
+            alpha[start:stop].astype(np.int64),
+            beta[start:stop].astype(np.int64),
+            **options,
+        )
+    return valid, assignment
+
+
+def _first_fit(alpha, beta, back, stop_on_failure):
+    """
+    car i takes a_i if free, else the nearest free spot at most `back` behind
+    a_i (only if a_i is taken), else the first free spot in (a_i, b_i]
+    """
+    rows, n = alpha.shape
+    occupied = np.zeros(rows, dtype=np.uint64)
+    alive = np.ones(rows, dtype=bool)
+    valid = np.ones(rows, dtype=bool)
+    assignment = np.zeros((rows, n), dtype=np.uint8)
+
+    for car in range(n):
+        a = alpha[:, car]
+        inside = alive & (a >= 1) & (a <= n)
+        spot = np.where(inside, first_fit_step(occupied, np.clip(a, 1, n), beta[:, car], back, n), 0)
+
+        parked = spot > 0
+        occupied |= np.where(parked, ONE << spot.astype(np.uint64), np.uint64(0))
+        assignment[:, car] = spot
+        valid &= parked
+        if stop_on_failure:
+            alive &= parked
+
+    return valid, assignment
+
+
+def _next_free(alpha, beta):
+    """
+    car i takes the first free spot in [a_i, b_i], for streets too wide for
+    a bitmask. each row has a union-find table where a taken spot points
+    past itself, so the first free spot >= a_i is a root lookup with path
+    halving, O(log n) amortized, checked against b_i
+    """
+    rows, n = alpha.shape
+    # spot n + 1 is a sentinel that is never taken
+    table = np.tile(np.arange(n + 2, dtype=np.int64), rows)
+    base = np.arange(rows, dtype=np.int64) * (n + 2)
+    valid = np.ones(rows, dtype=bool)
+    assignment = np.zeros((rows, n), dtype=spot_dtype(n))
+
+    for car in range(n):
+        a = alpha[:, car]
+        spot = np.clip(a, 1, n + 1)
+        # only rows whose lookup isn't already at a root walk on
+        active = np.flatnonzero(table[base + spot] != spot)
+        while active.size:
+            start = base[active]
+            parent = table[start + spot[active]]
+            grandparent = table[start + parent]
+            table[start + spot[active]] = grandparent
+            spot[active] = grandparent
+            active = active[table[start + grandparent] != grandparent]
+
+        parked = (a >= 1) & (spot <= np.minimum(beta[:, car], n))
+        table[base[parked] + spot[parked]] = spot[parked] + 1
+        assignment[:, car] = np.where(parked, spot, 0)
+        valid &= parked
+
+    return valid, assignment
+
+
+def _two_choice(alpha, beta):
+    """
+    car i takes a_i if free, else b_i if free, else the run stops
+    """
+    rows, n = alpha.shape
+    occupied = np.zeros(rows, dtype=np.uint64)
+    alive = np.ones(rows, dtype=bool)
+    assignment = np.zeros((rows, n), dtype=np.uint8)
+
+    for car in range(n):
+        spot = np.zeros(rows, dtype=np.int64)
+        for choice in (beta[:, car], alpha[:, car]):
+            ok = alive & (choice >= 1) & (choice <= n)
+            bit = ONE << np.clip(choice, 1, n).astype(np.uint64)
+            spot = np.where(ok & ((occupied & bit) == 0), choice, spot)
+
+        parked = spot > 0
+        occupied |= np.where(parked, ONE << spot.astype(np.uint64), np.uint64(0))
+        assignment[:, car] = spot
+        alive &= parked
+
+    return alive, assignment
+
+
+def _span(lo, hi):
+    """
+    bits lo..hi set (none where lo > hi)
+    """
+    lo = np.clip(lo, 0, MAX_SPOTS + 1)
+    top = np.clip(hi, -1, MAX_SPOTS) + 1
+    mask = (ONE << top.astype(np.uint64)) - (ONE << lo.astype(np.uint64))
+    return np.where(top > lo, mask, np.uint64(0))
+
+
+def _lowest_bit(x):
+    """
+    index of the lowest set bit of each nonzero x
+    """
+    return _log2(x & (~x + ONE))
+
+
+def _highest_bit(x):
+    """
+    index of the highest set bit of each nonzero x
+    """
+    for shift in (1, 2, 4, 8, 16, 32):
+        x = x | (x >> np.uint64(shift))
+    return _log2(x ^ (x >> ONE))
+
+
+def _log2(power):
+    # powers of two are exact as float64
+    return np.log2(np.maximum(power, ONE).astype(np.float64)).astype(np.int64)
@@ -0,0 +1,431 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import timeit
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+
+# timings for the simulators, frame rendering, enumerators and research
+# pipelines at growing n, appended to a JSON history so runs before and
+# after an engine change can be compared.
+#
+#   python bench.py run [--suite simulation ...] [--quick] [--label before]
+#   python bench.py compare [--baseline before] [--threshold 0.25]
+#   python bench.py startup
+
+HISTORY = os.environ.get('PF_BENCH_HISTORY') or os.path.join(
+    os.path.expanduser('~'), '.cache', 'parking_functions', 'bench_history.json')
+THRESHOLD = 0.25
+MIN_TIME = 0.2
+
+# cold start: a fresh process serving a script's first run, then a rerun
+STARTUP_SCRIPTS = ('main.py', 'pages/classical.py', 'pages/k_naples.py',
+                   'pages/l_interval.py', 'pages/unit_interval.py')
+STARTUP_BUDGET_MS = {'first': 2000, 'rerun': 150}
+
+# name -> (suite, sizes, setup); setup(n) returns the call to time
+CASES = {}
+
+
+def case(name, suite, sizes):
+    def register(setup):
+        CASES[name] = (suite, sizes, setup)
+        return setup
+    return register
+
+
+# simulation: worst case makes every car search as far as it can, average
+# case is a uniform random PF
+
+SIMULATION_SIZES = (16, 64, 256, 1024, 4096)
+
+
+@case('simulate_classical/worst', 'simulation', SIMULATION_SIZES)
+def _(n):
+    from animate import simulate_classical_parking
+    pf = [1] * n
+    return lambda: simulate_classical_parking(pf)
+
+
+@case('simulate_classical/average', 'simulation', SIMULATION_SIZES)
+def _(n):
+    from animate import simulate_classical_parking
+    from sampling import random_parking_function
+    pf = list(random_parking_function(n, rng=0))
+    return lambda: simulate_classical_parking(pf)
+
+
+@case('simulate_k_naples/worst', 'simulation', SIMULATION_SIZES)
+def _(n):
+    from animate import simulate_k_naples_parking
+    pf = [n] * n
+    return lambda: simulate_k_naples_parking(pf, n)
+
+
+@case('simulate_k_naples/average', 'simulation', SIMULATION_SIZES)
+def _(n):
+    from animate import simulate_k_naples_parking
+    from sampling import random_parking_function
+    pf = list(random_parking_function(n, rng=0))
+    return lambda: simulate_k_naples_parking(pf, 1)
+
+
+@case('simulate_interval/worst', 'simulation', SIMULATION_SIZES)
+def _(n):
+    from animate import simulate_interval_parking
+    alpha, beta = [1] * n, [n] * n
+    return lambda: simulate_interval_parking(alpha, beta)
+
+
+@case('simulate_unit_interval/worst', 'simulation', SIMULATION_SIZES)
+def _(n):
+    from animate import simulate_unit_interval_parking
+    # every car finds a_i = 1 taken and parks in b_i
+    alpha, beta = [1] * n, list(range(1, n + 1))
+    return lambda: simulate_unit_interval_parking(alpha, beta)
+
+
+@case('validate_interval/wide', 'simulation', (100, 400, 1600))
+def _(n):
+    from batch import validate_interval
+    # 256 random l-interval rows with l = n / 4, past the bitmask's 62 spots
+    rng = np.random.default_rng(0)
+    alpha = rng.integers(1, n + 1, (256, n))
+    beta = np.minimum(alpha + n // 4, n)
+    return lambda: validate_interval(alpha, beta)
+
+
+# rendering: one frame with every car but the last parked
+
+RENDERING_SIZES = (4, 8, 16, 32)
+
+
+@case('plot_parking_state', 'rendering', RENDERING_SIZES)
+def _(n):
+    import matplotlib.pyplot as plt
+    from animate import plot_parking_state
+    from street import park_classical
+    pf = list(range(1, n + 1))
+    assignment = park_classical(pf)
+
+    def frame():
+        fig = plot_parking_state(pf, assignment, n - 1)
+        fig.canvas.draw()
+        plt.close(fig)
+    return frame
+
+
+@case('draw_car', 'rendering', RENDERING_SIZES)
+def _(n):
+    import matplotlib.pyplot as plt
+    from animate import CAR_BOTTOM, CAR_HEIGHT, CAR_WIDTH, draw_car
+    fig, ax = plt.subplots()
+
+    def cars():
+        for spot in range(n):
+            draw_car(ax, spot, CAR_BOTTOM, CAR_WIDTH, CAR_HEIGHT, label=fr"$c_{{{spot + 1}}}$")
+        for patch in list(ax.patches) + list(ax.texts):
+            patch.remove()
+    return cars
+
+
+@case('street_renderer/step', 'rendering', RENDERING_SIZES)
+def _(n):
+    from animate import StreetRenderer
+    from street import park_classical
+    pf = list(range(1, n + 1))
+    assignment = park_classical(pf)
+    renderer = StreetRenderer(pf)
+
+    def frames():
+        for step in range(n + 1):
+            renderer.render(assignment, step)
+    return frames
+
+
+@case('strip_renderer/step', 'rendering', (100, 1000, 10000))
+def _(n):
+    from animate import StripRenderer, simulate_classical_parking
+    from sampling import random_parking_function
+    pf = list(random_parking_function(n, rng=0))
+    assignment = simulate_classical_parking(pf)[-1]
+    renderer = StripRenderer(pf)
+
+    def frames():
+        for step in range(RENDERING_SIZES[-1] + 1):
+            renderer.render(assignment, step)
+    return frames
+
+
+# enumeration of PF_n
+
+ENUMERATION_SIZES = (4, 5, 6, 7)
+
+
+@case('basic_parking_functions', 'enumeration', ENUMERATION_SIZES)
+def _(n):
+    from parking_functions import basic_parking_functions
+    return lambda: basic_parking_functions(n)
+
+
+@case('iter_parking_function_arrays', 'enumeration', ENUMERATION_SIZES)
+def _(n):
+    from parking_functions import iter_parking_function_arrays
+    return lambda: list(iter_parking_function_arrays(0, n, n, n))
+
+
+@case('unit_interval_parking_functions', 'enumeration', ENUMERATION_SIZES)
+def _(n):
+    from parking_functions import unit_interval_parking_functions
+    return lambda: unit_interval_parking_functions(n)
+
+
+# research pipelines on PF_n
+
+RESEARCH_SIZES = (4, 5, 6)
+
+
+def _pfs(n):
+    from parking_functions import iter_parking_function_arrays
+    return np.concatenate(list(iter_parking_function_arrays(0, n, n, n)))
+
+
+@case('classify', 'research', RESEARCH_SIZES + (7,))
+def _(n):
+    from subclasses import classify
+    pfs = _pfs(n)
+    return lambda: classify(pfs)
+
+
+@case('decompose_all', 'research', RESEARCH_SIZES)
+def _(n):
+    from findstat_local import bijections
+    from orbits import decompose_all
+    pfs, maps = _pfs(n), bijections()
+    return lambda: decompose_all(pfs, maps)
+
+
+@case('homomesy_sweep', 'research', RESEARCH_SIZES)
+def _(n):
+    from findstat_local import bijections, statistics
+    from homomesy import sweep
+    pfs, maps, stats = _pfs(n), bijections(), statistics()
+    return lambda: list(sweep(pfs, maps, stats))
+
+
+@case('friendship_graph_sizes', 'research', (4, 5, 6))
+def _(n):
+    from friendship import graph_sizes
+    return lambda: graph_sizes(n)
+
+
+def measure(call, repeat=3, min_time=MIN_TIME):
+    """
+    best seconds per call over `repeat` rounds, each looping long enough to
+    take about min_time; the minimum is the least noisy estimate
+    """
+    timer = timeit.Timer(call)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time or number >= 1 << 20:
+            break
+        number *= 2
+    return min(timer.repeat(repeat, number)) / number
+
+
+def fit(sizes, seconds):
+    """
+    least-squares seconds ~ coefficient * n^exponent on log-log axes
+    """
+    if len(sizes) < 2:
+        return None
+    exponent, intercept = np.polyfit(np.log(sizes), np.log(seconds), 1)
+    return {'exponent': round(float(exponent), 3), 'coefficient': float(np.exp(intercept))}
+
+
+def run(suites=None, names=None, quick=False, repeat=3, progress=None):
+    """
+    times the selected cases; quick drops each case's largest size.
+    returns case -> {'sizes', 'seconds', 'fit'}
+    """
+    results = {}
+    for name, (suite, sizes, setup) in CASES.items():
+        if (suites and suite not in suites) or (names and name not in names):
+            continue
+        sizes = sizes[:-1] if quick else sizes
+        seconds = []
+        for n in sizes:
+            seconds.append(measure(setup(n), repeat=repeat, min_time=MIN_TIME / 4 if quick else MIN_TIME))
+            if progress is not None:
+                progress(name, n, seconds[-1])
+        results[name] = {'suite': suite, 'sizes': list(sizes), 'seconds': seconds, 'fit': fit(sizes, seconds)}
+    return results
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """
+    (case, n, old seconds, new seconds, ratio) for every size that got more
+    than `threshold` slower, over the cases and sizes both runs share
+    """
+    regressions = []
+    for name, new in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        before = dict(zip(old['sizes'], old['seconds']))
+        for n, seconds in zip(new['sizes'], new['seconds']):
+            if n in before and seconds > before[n] * (1 + threshold):
+                regressions.append((name, n, before[n], seconds, seconds / before[n]))
+    return regressions
+
+
+def load_history(path=HISTORY):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_history(history, path=HISTORY):
+    # write then rename so an interrupted run never truncates the history
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def find_run(history, baseline=None):
+    """
+    a run by label, or by index into the history (negative counts back)
+    """
+    if baseline is None:
+        baseline = -2
+    try:
+        return history[int(baseline)]
+    except ValueError:
+        labelled = [entry for entry in history if entry.get('label') == baseline]
+        if not labelled:
+            raise KeyError(f"no run labelled {baseline!r}")
+        return labelled[-1]
+
+
+_STARTUP = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+times = {}
+for run in ('first', 'rerun'):
+    started = time.perf_counter()
+    app.run()
+    times[run] = (time.perf_counter() - started) * 1e3
+times['matplotlib'] = 'matplotlib' in sys.modules
+print(json.dumps(times))
+"""
+
+
+def startup(scripts=STARTUP_SCRIPTS):
+    """
+    script -> {'first', 'rerun' (ms), 'matplotlib' (imported or not)}, each
+    script run in a fresh interpreter the way a new replica serves it;
+    Streamlit's own import is not counted, it happens before the server listens
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for script in scripts:
+        done = subprocess.run(
+            [sys.executable, '-c', _STARTUP, os.path.join(root, script)],
+            capture_output=True, text=True, check=True, cwd=root,
+            env={**os.environ, 'PYTHONPATH': root},
+        )
+        results[script] = json.loads(done.stdout.strip().splitlines()[-1])
+    return results
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="parking function benchmarks")
+    parser.add_argument('--history', default=HISTORY, help="JSON file the runs are appended to")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="time the cases and append a run to the history")
+    run_parser.add_argument('--suite', action='append', choices=sorted({suite for suite, _, _ in CASES.values()}))
+    run_parser.add_argument('--case', action='append', choices=sorted(CASES))
+    run_parser.add_argument('--quick', action='store_true', help="skip the largest size of every case")
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--label', help="name to compare against later, e.g. before")
+
+    compare_parser = commands.add_parser('compare', help="flag cases slower than a baseline run")
+    compare_parser.add_argument('--baseline', help="label or history index (default: the run before the last)")
+    compare_parser.add_argument('--current', default='-1', help="label or history index (default: the last run)")
+    compare_parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                                help="allowed slowdown as a fraction (default %(default)s)")
+
+    startup_parser = commands.add_parser('startup', help="time a fresh process serving every page against the budget")
+    startup_parser.add_argument('--first-ms', type=float, default=STARTUP_BUDGET_MS['first'])
+    startup_parser.add_argument('--rerun-ms', type=float, default=STARTUP_BUDGET_MS['rerun'])
+
+    args = parser.parse_args(argv)
+    history = load_history(args.history)
+
+    if args.command == 'startup':
+        over = 0
+        for script, times in startup().items():
+            late = times['first'] > args.first_ms or times['rerun'] > args.rerun_ms
+            over += late
+            print(f"{script:28} first {times['first']:8.1f} ms  rerun {times['rerun']:7.1f} ms"
+                  f"{'  matplotlib loaded' if times['matplotlib'] else ''}{'  OVER BUDGET' if late else ''}")
+        return 1 if over else 0
+
+    if args.command == 'run':
+        def progress(name, n, seconds):
+            print(f"{name:36} n={n:<6} {seconds * 1e3:12.4f} ms", flush=True)
+        results = run(args.suite, args.case, quick=args.quick, repeat=args.repeat, progress=progress)
+        for name, result in results.items():
+            if result['fit'] is not None:
+                print(f"{name:36} ~ n^{result['fit']['exponent']}")
+        history.append({
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': _commit(), 'label': args.label,
+            'python': sys.version.split()[0], 'numpy': np.__version__, 'results': results,
+        })
+        save_history(history, args.history)
+        return 0
+
+    if len(history) < 2 and args.baseline is None:
+        print("need at least two runs in the history to compare", file=sys.stderr)
+        return 2
+    try:
+        baseline, current = find_run(history, args.baseline), find_run(history, args.current)
+    except (KeyError, IndexError) as error:
+        print(f"cannot compare: {error}", file=sys.stderr)
+        return 2
+    regressions = compare(baseline, current, args.threshold)
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old and old['fit'] and result['fit']:
+            print(f"{name:36} n^{old['fit']['exponent']} -> n^{result['fit']['exponent']}")
+    for name, n, before, after, ratio in regressions:
+        print(f"REGRESSION {name} n={n}: {before * 1e3:.4f} ms -> {after * 1e3:.4f} ms ({ratio:.2f}x)")
+    if not regressions:
+        print(f"no regressions beyond {args.threshold:.0%} ({baseline.get('commit')} -> {current.get('commit')})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import io
+import re
+
+import numpy as np
+
+from batch import (
+    CHUNK_ROWS, validate_classical, validate_interval, validate_k_naples, validate_unit_interval
+)
+
+# validation of whole files of preference lists for the bulk page: parsing,
+# chunked validation with progress, one results page at a time and a CSV
+# of every row. nothing here draws a figure
+
+VARIANTS = {
+    'classical': 'Classical',
+    'k_naples': 'k-Naples',
+    'l_interval': 'l-Interval (α then β on each row)',
+    'unit_interval': 'Unit-Interval',
+}
+
+_separators = re.compile(r'[\s,;]+')
+
+
+def read_preferences(data, filename=''):
+    """
+    2-D int64 array from an uploaded file: a .npy array, or text with one
+    preference list per line, like "1,1,2" or "(1, 1, 2)"; a header line
+    is skipped
+    """
+    if filename.lower().endswith('.npy'):
+        prefs = np.load(io.BytesIO(data), allow_pickle=False)
+        if prefs.ndim == 1:
+            prefs = prefs[None, :]
+        if prefs.ndim != 2 or not np.issubdtype(prefs.dtype, np.integer):
+            raise ValueError("the .npy file must hold a 2-D integer array, one list per row")
+        return prefs.astype(np.int64)
+
+    rows = []
+    for number, line in enumerate(data.decode('utf-8-sig').splitlines(), 1):
+        line = line.strip().strip('()[]').strip()
+        if not line:
+            continue
+        try:
+            rows.append([int(value) for value in _separators.split(line) if value])
+        except ValueError:
+            if rows:
+                raise ValueError(f"line {number} is not a list of integers: {line[:40]!r}")
+            continue  # header
+        if len(rows[-1]) != len(rows[0]):
+            raise ValueError(f"line {number} has {len(rows[-1])} values, the first list has {len(rows[0])}")
+    if not rows:
+        raise ValueError("no preference lists found")
+    return np.array(rows, dtype=np.int64)
+
+
+def validate(variant, prefs, k=None, progress=None):
+    """
+    (valid, spots, failing) for every row: spots[r, i] is the spot car i
+    took (0 if none) and failing[r] the first car that could not park
+    (1-based, 0 if all did). l-interval rows hold α then β side by side; a
+    car with b_i < a_i just fails.
+    progress(done, total) is called after every chunk of rows
+    """
+    prefs = np.asarray(prefs)
+    if variant == 'l_interval':
+        if prefs.shape[1] % 2:
+            raise ValueError("l-interval rows need an even number of values: α then β")
+        n = prefs.shape[1] // 2
+    elif variant == 'k_naples' and k is None:
+        raise ValueError("k-Naples validation needs k")
+    elif variant not in VARIANTS:
+        raise ValueError(f"unknown variant {variant!r}")
+
+    rows = len(prefs)
+    valid = np.empty(rows, dtype=bool)
+    spots = None
+    for start in range(0, rows, CHUNK_ROWS):
+        chunk = prefs[start:start + CHUNK_ROWS]
+        if variant == 'classical':
+            chunk_valid, chunk_spots = validate_classical(chunk)
+        elif variant == 'k_naples':
+            chunk_valid, chunk_spots = validate_k_naples(chunk, k)
+        elif variant == 'l_interval':
+            chunk_valid, chunk_spots = validate_interval(chunk[:, :n], chunk[:, n:])
+        else:
+            chunk_valid, chunk_spots = validate_unit_interval(chunk)
+        if spots is None:
+            spots = np.empty((rows, chunk_spots.shape[1]), dtype=chunk_spots.dtype)
+        valid[start:start + len(chunk)], spots[start:start + len(chunk)] = chunk_valid, chunk_spots
+        if progress is not None:
+            progress(start + len(chunk), rows)
+    if spots is None:
+        spots = np.empty((0, 0), dtype=np.uint8)
+    return valid, spots, failing_cars(spots)
+
+
+def failing_cars(spots):
+    """
+    1-based index of the first car without a spot in each row, 0 if every car parked
+    """
+    missing = spots == 0
+    return np.where(missing.any(axis=1), np.argmax(missing, axis=1) + 1, 0)
+
+
+def results_frame(prefs, valid, spots, failing, start=0, stop=None):
+    """
+    a pandas table of rows start..stop with the outcome of each
+    """
+    import pandas as pd
+
+    stop = len(prefs) if stop is None else min(stop, len(prefs))
+    return pd.DataFrame({
+        'row': np.arange(start, stop) + 1,
+        'preferences': [_tuple(row) for row in prefs[start:stop]],
+        'valid': valid[start:stop],
+        # nullable ints: a plain column would turn the missing cars into NaN floats
+        'failing car': pd.array([int(car) or None for car in failing[start:stop]], dtype='Int64'),
+        'spots': [_tuple(row, missing='-') for row in spots[start:stop]],
+    })
+
+
+def results_csv(prefs, valid, spots, failing, chunk_rows=1 << 14):
+    """
+    every row as CSV: the preferences (α then β for l-interval), valid
+    (0/1), failing car (0 if none) and the spot of every car (0 if none)
+    """
+    width, cars = prefs.shape[1], spots.shape[1]
+    if width == cars:
+        columns = [f"p{i}" for i in range(1, cars + 1)]
+    else:
+        columns = [f"a{i}" for i in range(1, cars + 1)] + [f"b{i}" for i in range(1, cars + 1)]
+    header = columns + ['valid', 'failing_car'] + [f"spot{i}" for i in range(1, cars + 1)]
+    buffer = io.BytesIO()
+    buffer.write((','.join(header) + '\n').encode())
+    for start in range(0, len(prefs), chunk_rows):
+        stop = start + chunk_rows
+        table = np.column_stack((
+            prefs[start:stop], valid[start:stop].astype(np.int64), failing[start:stop], spots[start:stop],
+        )).astype(np.int64)
+        buffer.write(_csv_rows(table))
+    return buffer.getvalue()
+
+
+def _csv_rows(table):
+    # each distinct value is formatted once, then every cell is a lookup and
+    # the chunk a single join; np.savetxt formats cell by cell
+    values, inverse = np.unique(table, return_inverse=True)
+    inverse = inverse.reshape(table.shape)
+    values = values.tolist()
+    cells = np.array([f"{value}," for value in values], dtype=object)[inverse]
+    cells[:, -1] = np.array([f"{value}\n" for value in values], dtype=object)[inverse[:, -1]]
+    return ''.join(cells.ravel().tolist()).encode()
+
+
+def _tuple(row, missing=None):
+    return "(" + ", ".join(missing if missing is not None and value == 0 else str(value) for value in row.tolist()) + ")"
@@ -0,0 +1,210 @@
+from functools import lru_cache
+from math import comb, factorial
+
+
+def count_parking_functions(k, l, m, n):
+    """
+    number of parking functions with k steps back, l steps forward, m cars
+    and n spots (same rules as parking_functions.iter_parking_functions),
+    without enumerating them.
+
+    count by the order spots fill up: a car lands in free spot s from
+    preference s, from a taken spot at most k past s in the run right after
+    it (going back), or from a spot in the run right before it at most l
+    behind s that has no free spot within k behind it (going forward).
+    those runs are bounded by free spots, so a block of full spots splits at
+    the spot it filled last into two blocks that fill independently
+    """
+    if m > n:
+        return 0
+    return _count_street(k, l, m, n)
+
+
+@lru_cache(maxsize=None)
+def _count_block(k, l, length, at_start):
+    """
+    ways to fill a block of `length` spots whose neighbours stay free (or are
+    the ends of the street); at_start means the block begins at spot 1
+    """
+    if length == 0:
+        return 1
+    total = 0
+    for last in range(1, length + 1):
+        # preference == last, back from the run after it, forward from the run before it
+        ways = 1 + min(length - last, k)
+        for preferred in range(max(1, last - l), last):
+            if at_start or preferred >= 1 + k:
+                ways += 1
+        total += (
+            comb(length - 1, last - 1)
+            * _count_block(k, l, last - 1, at_start)
+            * _count_block(k, l, length - last, False)
+            * ways
+        )
+    return total
+
+
+def _count_street(k, l, m, n):
+    # ways_after(spot, cars): cars filling blocks past a spot that stays free
+    @lru_cache(maxsize=None)
+    def ways_after(free_spot, cars):
+        if cars == 0:
+            return 1
+        total = 0
+        for first in range(free_spot + 1, n + 1):
+            for length in range(1, min(cars, n - first + 1) + 1):
+                last = first + length - 1
+                if last < n:
+                    rest = ways_after(last + 1, cars - length)
+                else:
+                    rest = 1 if cars == length else 0
+                total += comb(cars, length) * _count_block(k, l, length, first == 1) * rest
+        return total
+
+    return ways_after(0, m)
+
+
+def count_classical(n):
+    if n == 0:
+        return 1
+    return (n + 1)**(n - 1)
+
+
+def count_prime(n):
+    if n == 0:
+        return 1
+    return (n - 1)**(n - 1)
+
+
+def count_primary(n):
+    # a_i <= i for every car, which always parks
+    return factorial(n)
+
+
+@lru_cache(maxsize=None)
+def count_fubini(n):
+    """
+    Fubini rankings of length n (ordered set partitions)
+    """
+    if n == 0:
+        return 1
+    return sum(comb(n, tied) * count_fubini(n - tied) for tied in range(1, n + 1))
+
+
+def count_picky(n):
+    # picky PFs are the Cayley permutations, counted by the Fubini numbers
+    return count_fubini(n)
+
+
+def count_unit_fubini(n):
+    """
+    Fubini rankings that are also unit interval PFs (k = 1, l = 1).
+
+    only ties of one or two cars can park, and a tie of two at rank r > 1
+    parks iff its second car comes after the last car of the previous tie.
+    insert ties left to right into the arrival order, tracking where that
+    last car sits: ways[t][p] counts orders of the first t cars with it at p
+    """
+    if n == 0:
+        return 1
+    ways = [[0]*(n + 2) for _ in range(n + 1)]
+    ways[0][0] = 1
+    for placed in range(n):
+        row = ways[placed]
+        total = sum(row)
+        if not total:
+            continue
+        # a lone car can go anywhere
+        for position in range(1, placed + 2):
+            ways[placed + 1][position] += total
+        # a tie of two needs its second car after the previous last car
+        if placed + 2 <= n:
+            if placed == 0:
+                ways[2][2] += 1
+            else:
+                before = 0
+                for second in range(2, placed + 3):
+                    before += row[second - 2]
+                    ways[placed + 2][second] += (second - 1) * before
+    return sum(ways[n])
+
+
+FAMILIES = {
+    'classical': count_classical,
+    'prime': count_prime,
+    'primary': count_primary,
+    'picky': count_picky,
+    'fubini': count_fubini,
+    'unit_fubini': count_unit_fubini,
+}
+
+
+def count(family, n):
+    return FAMILIES[family](n)
+
+
+def sizes(family, n_max, start=1):
+    """
+    the notebook's "Seq. of Sizes" for a family
+    """
+    return [count(family, n) for n in range(start, n_max + 1)]
+
+
+def brute_force_count(family, n):
+    """
+    enumerates and filters like the notebook, for cross-checking small n
+    """
+    from parking_functions import iter_parking_functions
+
+    if family == 'unit_fubini':
+        return sum(1 for pf in iter_parking_functions(1, 1, n, n) if _is_classical(pf) and _is_fubini(pf))
+    is_member = {
+        'classical': lambda pf: True,
+        'prime': _is_prime,
+        'primary': lambda pf: all(car <= i + 1 for i, car in enumerate(pf)),
+        'picky': lambda pf: sorted(set(pf)) == list(range(1, len(set(pf)) + 1)),
+        'fubini': _is_fubini,
+    }[family]
+    return sum(1 for pf in iter_parking_functions(0, n, n, n) if is_member(pf))
+
+
+def check_counts(n_max=6):
+    """
+    compares every counter with brute force up to n_max; returns the mismatches
+    """
+    from parking_functions import iter_parking_functions
+
+    mismatches = []
+    for family in FAMILIES:
+        for n in range(1, n_max + 1):
+            expected = brute_force_count(family, n)
+            if count(family, n) != expected:
+                mismatches.append((family, n, count(family, n), expected))
+    for n in range(0, n_max + 1):
+        for m in range(0, n + 1):
+            for k in range(0, n + 1):
+                for l in range(0, n + 1):
+                    expected = sum(1 for _ in iter_parking_functions(k, l, m, n))
+                    if count_parking_functions(k, l, m, n) != expected:
+                        mismatches.append(((k, l, m), n, count_parking_functions(k, l, m, n), expected))
+    return mismatches
+
+
+def _is_classical(pf):
+    return all(car <= i + 1 for i, car in enumerate(sorted(pf)))
+
+
+def _is_prime(pf):
+    # drop one 1; what is left must be a PF of length n - 1
+    rest = sorted(pf)
+    if not rest or rest[0] != 1:
+        return False
+    return all(car <= i + 1 for i, car in enumerate(rest[1:]))
+
+
+def _is_fubini(pf):
+    sorted_pf = sorted(pf)
+    return sorted_pf[0] == 1 and all(
+        value in (previous, i + 1)
+        for i, (previous, value) in enumerate(zip(sorted_pf, sorted_pf[1:]), 1)
+    )
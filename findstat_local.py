@@ -0,0 +1,362 @@
+import ast
+import json
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from batch import validate_classical
+from orbits import rotate_back_to_front, rotate_front_to_back
+from sampling import rotate_to_parking_functions
+
+# offline stand-ins for the FindStat maps and statistics on parking functions
+# (collection Cc0023) the notebook uses. every kernel takes a 2-D array with
+# one classical PF per row and works on all rows at once
+
+DOMAIN = 'Cc0023'
+NOTEBOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reserach', 'exp.ipynb')
+
+Map = namedtuple('Map', 'id name kernel bijective')
+Statistic = namedtuple('Statistic', 'id name kernel')
+
+
+# MAPS
+
+def reverse(pfs):
+    return np.asarray(pfs)[:, ::-1]
+
+
+def complement(pfs):
+    # n + 1 - a_i, rotated back into PF_n (Pollak)
+    pfs = np.asarray(pfs, dtype=np.int64)
+    return rotate_to_parking_functions(pfs.shape[1] + 1 - pfs)
+
+
+def to_non_decreasing(pfs):
+    return np.sort(pfs, axis=1)
+
+
+MAPS = {
+    293: Map(293, 'rotate front-to-back', rotate_front_to_back, True),
+    298: Map(298, 'repeats to leading', None, True),
+    299: Map(299, 'ones to leading', None, True),
+    300: Map(300, 'leading to ones', None, True),
+    301: Map(301, 'leading to repeats', None, True),
+    303: Map(303, 'complement', complement, True),
+    304: Map(304, 'rotate back-to-front', rotate_back_to_front, True),
+    320: Map(320, 'reverse', reverse, True),
+    52: Map(52, 'to non-decreasing parking function', to_non_decreasing, False),
+}
+
+
+# STATISTICS
+
+def _as_pfs(pfs):
+    pfs = np.asarray(pfs, dtype=np.int64)
+    if pfs.ndim != 2:
+        raise ValueError("expected a 2-D array with one parking function per row")
+    return pfs
+
+
+def spots(pfs):
+    """
+    the spot every car parks in
+    """
+    return validate_classical(pfs)[1].astype(np.int64)
+
+
+def area_sequence(pfs):
+    # row i of the Dyck path sits i - b_i units right of the diagonal, b sorted
+    pfs = _as_pfs(pfs)
+    return np.arange(1, pfs.shape[1] + 1) - np.sort(pfs, axis=1)
+
+
+def labelling(pfs):
+    # cars in the order their preferences sort, like Sage's to_labelling_permutation
+    return np.argsort(_as_pfs(pfs), axis=1, kind='stable') + 1
+
+
+def lucky_cars(pfs):
+    pfs = _as_pfs(pfs)
+    return (spots(pfs) == pfs).sum(axis=1)
+
+
+def primary_dinversion_pairs(pfs):
+    area, labels = area_sequence(pfs), labelling(pfs)
+    total = np.zeros(len(area), dtype=np.int64)
+    for j in range(area.shape[1]):
+        total += ((area[:, :j] == area[:, j, None]) & (labels[:, :j] < labels[:, j, None])).sum(axis=1)
+    return total
+
+
+def secondary_dinversion_pairs(pfs):
+    area, labels = area_sequence(pfs), labelling(pfs)
+    total = np.zeros(len(area), dtype=np.int64)
+    for j in range(area.shape[1]):
+        total += ((area[:, :j] == area[:, j, None] + 1) & (labels[:, :j] > labels[:, j, None])).sum(axis=1)
+    return total
+
+
+def dinv(pfs):
+    return primary_dinversion_pairs(pfs) + secondary_dinversion_pairs(pfs)
+
+
+def entry_sum(pfs):
+    return _as_pfs(pfs).sum(axis=1)
+
+
+def area(pfs):
+    # also the total displacement
+    return area_sequence(pfs).sum(axis=1)
+
+
+def entry_sum_minus_length(pfs):
+    pfs = _as_pfs(pfs)
+    return pfs.sum(axis=1) - pfs.shape[1]
+
+
+def critical_left_to_right_maxima(pfs):
+    # a strict left-to-right maximum v with exactly v entries <= v
+    pfs = _as_pfs(pfs)
+    previous = np.maximum.accumulate(np.pad(pfs, ((0, 0), (1, 0)))[:, :-1], axis=1)
+    total = np.zeros(len(pfs), dtype=np.int64)
+    for i in range(pfs.shape[1]):
+        value = pfs[:, i]
+        at_most = (pfs <= value[:, None]).sum(axis=1)
+        total += (value > previous[:, i]) & (at_most == value)
+    return total
+
+
+def most_unlucky_displacement(pfs):
+    pfs = _as_pfs(pfs)
+    return (spots(pfs) - pfs).max(axis=1, initial=0)
+
+
+def pmaj(pfs):
+    """
+    going up the spots, each spot takes the largest waiting car below the
+    last one taken (else the largest waiting car); pmaj is the major index
+    of that word read backwards
+    """
+    pfs = _as_pfs(pfs)
+    rows, n = pfs.shape
+    cars = np.arange(1, n + 1)
+    waiting = np.zeros((rows, n), dtype=bool)
+    word = np.zeros((rows, n), dtype=np.int64)
+    last = np.full(rows, n + 1)
+    for spot in range(1, n + 1):
+        waiting |= pfs == spot
+        below = np.where(waiting & (cars < last[:, None]), cars, 0).max(axis=1)
+        largest = np.where(waiting, cars, 0).max(axis=1)
+        last = np.where(below > 0, below, largest)
+        word[:, spot - 1] = last
+        waiting[np.arange(rows), last - 1] = False
+    # a descent of the reversed word at i is an ascent of the word at n - i
+    return ((word[:, :-1] < word[:, 1:]) * np.arange(n - 1, 0, -1)).sum(axis=1)
+
+
+def fixed_points(pfs):
+    pfs = _as_pfs(pfs)
+    return (pfs == np.arange(1, pfs.shape[1] + 1)).sum(axis=1)
+
+
+def initial_increasing_length(pfs):
+    pfs = _as_pfs(pfs)
+    # the segment always ends at the last car
+    breaks = np.diff(pfs, axis=1, append=0) <= 0
+    breaks[:, -1:] = True
+    return breaks.argmax(axis=1) + 1
+
+
+def preferences_below_index(pfs):
+    pfs = _as_pfs(pfs)
+    return (pfs < np.arange(1, pfs.shape[1] + 1)).sum(axis=1)
+
+
+def ascents(pfs):
+    return (np.diff(_as_pfs(pfs), axis=1) > 0).sum(axis=1)
+
+
+def center_size(pfs):
+    pfs = _as_pfs(pfs)
+    return (pfs <= np.arange(1, pfs.shape[1] + 1)).sum(axis=1)
+
+
+STATISTICS = {
+    135: Statistic(135, 'The number of lucky cars of the parking function.', lucky_cars),
+    136: Statistic(136, 'The dinv of a parking function.', dinv),
+    165: Statistic(165, 'The sum of the entries of a parking function.', entry_sum),
+    188: Statistic(188, 'The area of the Dyck path corresponding to a parking function and the total displacement of a parking function.', area),
+    194: Statistic(194, 'The number of primary dinversion pairs of a labelled dyck path corresponding to a parking function.', primary_dinversion_pairs),
+    195: Statistic(195, 'The number of secondary dinversion pairs of the dyck path corresponding to a parking function.', secondary_dinversion_pairs),
+    540: Statistic(540, 'The sum of the entries of a parking function minus its length.', entry_sum_minus_length),
+    942: Statistic(942, 'The number of critical left to right maxima of the parking functions.', critical_left_to_right_maxima),
+    943: Statistic(943, 'The number of spots the most unlucky car had to go further in a parking function.', most_unlucky_displacement),
+    1209: Statistic(1209, 'The pmaj statistic of a parking function.', pmaj),
+    1903: Statistic(1903, 'The number of fixed points of a parking function.', fixed_points),
+    1904: Statistic(1904, 'The length of the initial strictly increasing segment of a parking function.', initial_increasing_length),
+    1905: Statistic(1905, 'The number of preferred parking spots in a parking function less than the index of the car.', preferences_below_index),
+    1935: Statistic(1935, 'The number of ascents in a parking function.', ascents),
+    1937: Statistic(1937, 'The size of the center of a parking function.', center_size),
+}
+
+
+# LOOKUP
+
+# lookups for ids without a local kernel, e.g. sage's findmap/findstat where
+# the database is reachable; they get one PF (a list) at a time
+FALLBACK = {'map': None, 'stat': None}
+
+
+def use_fallback(findmap=None, findstat=None):
+    FALLBACK['map'], FALLBACK['stat'] = findmap, findstat
+
+
+class Entry:
+    """
+    a map or statistic as the notebook calls it: on one PF (a list or tuple)
+    it returns one value, on a 2-D array every row's value
+    """
+
+    def __init__(self, prefix, id, name, kernel):
+        self.prefix, self.id, self.name, self.kernel = prefix, id, name, kernel
+
+    def __repr__(self):
+        width = 5 if self.prefix == 'Mp' else 6
+        return "{}{:0{}d}: {}".format(self.prefix, self.id, width, self.name)
+
+    def __call__(self, pfs):
+        array = np.asarray(pfs)
+        if array.ndim == 1:
+            result = self.kernel(array[None, :])[0]
+            return [int(x) for x in result] if np.ndim(result) else int(result)
+        return self.kernel(array)
+
+
+def findmap(id):
+    entry = MAPS.get(int(id))
+    if entry is None:
+        raise ValueError(f"Mp{int(id):05d} is not a map on parking functions here")
+    return Entry('Mp', entry.id, entry.name, entry.kernel or _fallback('map', entry.id))
+
+
+def findstat(id):
+    entry = STATISTICS.get(int(id))
+    if entry is None:
+        if FALLBACK['stat'] is None:
+            raise ValueError(f"St{int(id):06d} has no local kernel and no fallback is set")
+        return Entry('St', int(id), '', _fallback('stat', int(id)))
+    return Entry('St', entry.id, entry.name, entry.kernel)
+
+
+def FindStatMaps(domain=DOMAIN, codomain=DOMAIN):
+    """
+    the maps from parking functions to parking functions
+    """
+    if domain != DOMAIN or codomain != DOMAIN:
+        raise ValueError(f"only {DOMAIN} (parking functions) is available offline")
+    return [findmap(id) for id, entry in MAPS.items() if entry.kernel is not None or FALLBACK['map'] is not None]
+
+
+def bijections():
+    """
+    id -> kernel for every map that is a bijection and has a local kernel,
+    ready for orbits.decompose_all or homomesy.sweep
+    """
+    return {id: entry.kernel for id, entry in MAPS.items() if entry.bijective and entry.kernel is not None}
+
+
+def statistics():
+    return {id: entry.kernel for id, entry in STATISTICS.items()}
+
+
+def _fallback(kind, id):
+    lookup = FALLBACK[kind]
+    if lookup is None:
+        name = f"Mp{id:05d}" if kind == 'map' else f"St{id:06d}"
+        raise ValueError(f"{name} has no local kernel and no fallback is set")
+    remote = lookup(id)
+
+    def kernel(pfs):
+        return np.array([remote([int(x) for x in pf]) for pf in np.asarray(pfs)], dtype=np.int64)
+    return kernel
+
+
+# CONFORMANCE
+
+def reference_from_notebook(path=NOTEBOOK):
+    """
+    the FindStat values Sage printed into the notebook's outputs: map images
+    (orbits list x, f(x), ... and Sage stops an orbit when f(x) leaves the
+    set, so neighbours are always a PF and its image), statistic orbit
+    averages rounded to 2 places and, from the one-PF orbits, the exact
+    statistic value of every PF printed alone
+    """
+    with open(path) as f:
+        cells = json.load(f)['cells']
+
+    images, averages, values = {}, {}, {}
+    for cell in cells:
+        for output in cell.get('outputs', []):
+            current = None
+            for line in ''.join(output.get('text', '')).splitlines():
+                header = re.match(r'Bijection: (\d+), Statistic: (\d+)', line)
+                if header:
+                    current = int(header[1]), int(header[2])
+                    continue
+                orbit = re.match(r'\s+Orbit: (\[.*\]), Average: (\S+)', line)
+                if orbit and current:
+                    members = tuple(tuple(pf) for pf in ast.literal_eval(orbit[1]))
+                    for pf, image in zip(members, members[1:]):
+                        images.setdefault(current[0], {})[pf] = image
+                    averages.setdefault(current[1], {})[members] = float(orbit[2])
+                    if len(members) == 1:
+                        values.setdefault(current[1], {})[members[0]] = round(float(orbit[2]))
+    return images, averages, values
+
+
+def conformance(reference=None):
+    """
+    checks every local kernel against reference values (the notebook's by
+    default); returns the mismatches as (id, input, expected, got)
+    """
+    images, averages, values = reference_from_notebook() if reference is None else reference
+    mismatches = []
+    for id, pairs in images.items():
+        kernel = MAPS[id].kernel if id in MAPS else None
+        if kernel is None:
+            continue
+        for n, rows in _by_length(pairs).items():
+            pfs = np.array(rows)
+            expected = np.array([pairs[pf] for pf in rows])
+            got = kernel(pfs)
+            for i in np.flatnonzero((got != expected).any(axis=1)):
+                mismatches.append((id, rows[i], tuple(expected[i]), tuple(int(x) for x in got[i])))
+    for id, recorded in values.items():
+        if id not in STATISTICS:
+            continue
+        for n, rows in _by_length(recorded).items():
+            expected = np.array([recorded[pf] for pf in rows])
+            got = STATISTICS[id].kernel(np.array(rows))
+            for i in np.flatnonzero(got != expected):
+                mismatches.append((id, rows[i], int(expected[i]), int(got[i])))
+    # longer orbits only have their average
+    for id, orbits in averages.items():
+        if id not in STATISTICS:
+            continue
+        kernel = STATISTICS[id].kernel
+        for members, expected in orbits.items():
+            if len(members) == 1:
+                continue
+            got = round(float(kernel(np.array(members)).mean()), 2)
+            if got != expected:
+                mismatches.append((id, members, expected, got))
+    return mismatches
+
+
+def _by_length(pairs):
+    lengths = {}
+    for pf in pairs:
+        lengths.setdefault(len(pf), []).append(pf)
+    return lengths
@@ -0,0 +1,88 @@
+import json
+from array import array
+
+# spots are 1-based, so 0 marks a car that failed to park
+FAILED = 0
+
+
+class FrameLog:
+    """
+    compact record of a simulation: one (car, spot) event per car instead of
+    a full assignment per frame. frames are rebuilt on demand, so a log still
+    reads like a list of frames: len(log), log[step], log[-1]
+    """
+
+    def __init__(self, n, cars=(), spots=()):
+        self.n = n
+        self.cars = array('i', cars)
+        self.spots = array('i', spots)
+
+    @classmethod
+    def from_steps(cls, steps, n):
+        log = cls(n)
+        for car, spot in steps:
+            log.record(car, spot)
+        return log
+
+    def record(self, car, spot):
+        self.cars.append(car)
+        self.spots.append(FAILED if spot is None else spot)
+
+    def events(self):
+        """
+        (car, spot) per step, spot None for a failed car
+        """
+        for car, spot in zip(self.cars, self.spots):
+            yield car, (None if spot == FAILED else spot)
+
+    def frame(self, step):
+        """
+        assignment after the first `step` cars have tried to park
+        """
+        assignment = [None]*self.n
+        for car, spot in zip(self.cars[:step], self.spots[:step]):
+            assignment[car] = None if spot == FAILED else spot
+        return assignment
+
+    def __len__(self):
+        # empty street plus one frame per event
+        return len(self.cars) + 1
+
+    def __getitem__(self, step):
+        if step < 0:
+            step += len(self)
+        if not 0 <= step < len(self):
+            raise IndexError("frame index out of range")
+        return self.frame(step)
+
+    def __iter__(self):
+        assignment = [None]*self.n
+        yield assignment[:]
+        for car, spot in self.events():
+            assignment[car] = spot
+            yield assignment[:]
+
+    def tobytes(self):
+        header = array('i', [self.n, len(self.cars)])
+        return header.tobytes() + self.cars.tobytes() + self.spots.tobytes()
+
+    @classmethod
+    def frombytes(cls, data):
+        values = array('i')
+        values.frombytes(data)
+        n, count = values[0], values[1]
+        return cls(n, values[2:2 + count], values[2 + count:2 + 2*count])
+
+    def todict(self):
+        """
+        the log as plain lists (spot 0 for a failed car), ready for JSON
+        """
+        return {'n': self.n, 'cars': self.cars.tolist(), 'spots': self.spots.tolist()}
+
+    def tojson(self):
+        return json.dumps(self.todict(), separators=(',', ':'))
+
+    @classmethod
+    def fromjson(cls, data):
+        values = json.loads(data)
+        return cls(values['n'], values['cars'], values['spots'])
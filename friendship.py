@@ -0,0 +1,260 @@
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from parking_functions import iter_parking_function_arrays
+
+# friendship PFs follow the notebook's rules: preference a is used as a
+# 0-based spot, a car bumped off a taken spot tries the next one, and it
+# may only park next to cars it is friends with. it tries a, then a + 1;
+# a car failing both just does not park, unless a + 1 == n, which fails
+# the whole run.
+#
+# graphs are bitmasks over edges(n), bit i for the i-th edge in the
+# notebook's combinations order. a car only ever asks about its friendship
+# with the cars around the spot it tries, and never about two earlier cars,
+# so the runs of every PF for every graph are shared as one walk over
+# (classical street, friendship lot) states whose moves are cubes of graphs:
+# the edges a move needs present and the ones it needs absent.
+
+
+def edges(n):
+    return list(combinations(range(1, n + 1), 2))
+
+
+def graph_mask(graph, n):
+    """
+    the bitmask of a list of edges (either orientation)
+    """
+    if not isinstance(graph, (list, tuple)):
+        return int(graph)
+    position = {edge: i for i, edge in enumerate(edges(n))}
+    mask = 0
+    for i, j in graph:
+        mask |= 1 << position[(min(i, j), max(i, j))]
+    return mask
+
+
+def friends(graph, n):
+    """
+    each car's friends as a bitmask, bit j for car j (entry 0 unused)
+    """
+    mask = graph_mask(graph, n)
+    friends = [0] * (n + 1)
+    for i, (a, b) in enumerate(edges(n)):
+        if mask >> i & 1:
+            friends[a] |= 1 << b
+            friends[b] |= 1 << a
+    return friends
+
+
+def validate_friendship(prefs, graph):
+    """
+    validates every row of prefs as a friendship PF for one graph; returns
+    (valid, lot) where lot[r, s] is the car left in 0-based spot s (0 if none)
+    """
+    prefs = np.asarray(prefs)
+    if prefs.ndim != 2:
+        raise ValueError("expected a 2-D array with one preference tuple per row")
+    rows, n = prefs.shape
+    friend_masks = np.array(friends(graph, n), dtype=np.uint64)
+    lot = np.zeros((rows, n), dtype=np.uint8)
+    valid = np.ones(rows, dtype=bool)
+    every = np.arange(rows)
+
+    def try_spot(spot, car):
+        # the notebook's can_park: one step on if taken, then both neighbours
+        # must be empty, the end of the street or friends
+        inside = (spot >= 0) & (spot < n)
+        spot = np.clip(spot, 0, n - 1)
+        spot = spot + (lot[every, spot] != 0)
+        inside &= spot < n
+        spot = np.clip(spot, 0, n - 1)
+        ok = inside
+        for side, end in ((spot - 1, spot == 0), (spot + 1, spot == n - 1)):
+            other = lot[every, np.clip(side, 0, n - 1)].astype(np.uint64)
+            ok &= end | (other == 0) | ((friend_masks[car] >> other) & np.uint64(1) != 0)
+        return ok, spot
+
+    for car in range(1, n + 1):
+        a = prefs[:, car - 1].astype(np.int64)
+        first, spot = try_spot(a, car)
+        second, next_spot = try_spot(a + 1, car)
+        second &= ~first
+        valid &= first | second | (a + 1 != n)
+        parked = valid & (first | second)
+        spot = np.where(first, spot, next_spot)
+        lot[every[parked], spot[parked]] = car
+    return valid, lot
+
+
+def friendship_pfs(n, graph):
+    """
+    the classical PFs that are friendship PFs for one graph, as uint8 rows
+    """
+    blocks = [block[validate_friendship(block, graph)[0]] for block in iter_parking_function_arrays(0, n, n, n)]
+    return np.concatenate(blocks) if blocks else np.empty((0, n), dtype=np.uint8)
+
+
+def graph_sizes(n):
+    """
+    number of friendship PFs of every graph on n cars, indexed by graph
+    bitmask (2^C(n, 2) entries).
+
+    the walk over shared states runs forward from the empty street to a
+    middle depth h, counting prefixes per graph on cars 1..h, and backward
+    from the full street to h, counting completions per graph on the edges
+    of cars h+1..n. a graph's count is their product summed over the states
+    at h: a single matrix product
+    """
+    levels, moves = _walk(n)
+    h = min(range(n + 1), key=lambda d: len(levels[d]) * (2**comb(d, 2) + 2**(comb(n, 2) - comb(d, 2))))
+    # counts stay below (n + 1)^(n - 1), exact in float32 while that fits 24 bits
+    dtype = np.float32 if (n + 1)**(n - 1) < 1 << 24 else np.float64
+
+    forward = np.ones((1, 1), dtype=dtype)
+    for d in range(h):
+        # car d + 1 adds its d friendships with earlier cars as the high bits
+        grown = np.zeros((len(levels[d + 1]), 2**d, forward.shape[1]), dtype=dtype)
+        for state, outcomes in enumerate(moves[d]):
+            for present, absent, target in outcomes:
+                grown[target, _cube(present, absent, d)] += forward[state]
+        forward = grown.reshape(len(grown), -1)
+
+    backward = np.ones((len(levels[n]), 1), dtype=dtype)
+    for d in range(n - 1, h - 1, -1):
+        # car d + 1 adds its d friendships as the low bits
+        grown = np.zeros((len(levels[d]), backward.shape[1], 2**d), dtype=dtype)
+        for state, outcomes in enumerate(moves[d]):
+            for present, absent, target in outcomes:
+                grown[state][:, _cube(present, absent, d)] += backward[target][:, None]
+        backward = grown.reshape(len(grown), -1)
+
+    by_car = np.rint(backward.T @ forward).astype(np.int64).ravel()
+    return by_car[_car_order(n)]
+
+
+def count_friendship_pfs(n):
+    """
+    number of (graph, friendship PF) pairs on n cars
+    """
+    return int(graph_sizes(n).sum())
+
+
+def sizes(n_max, start=1):
+    """
+    the notebook's "Seq. of Sizes" for friendship PFs
+    """
+    return [count_friendship_pfs(n) for n in range(start, n_max + 1)]
+
+
+def _walk(n):
+    """
+    the states reachable car by car, levels[d] mapping (classical street,
+    friendship lot) to an index, and moves[d][state] listing its
+    (present, absent, next state) cubes, bit j - 1 for the edge to car j
+    """
+    levels = [{(0, (0,) * n): 0}]
+    moves = []
+    for car in range(1, n + 1):
+        following, outcomes = {}, []
+        for street, lot in levels[-1]:
+            outcomes.append([])
+            for a in range(1, n + 1):
+                # classical first fit, so only prefixes of PF_n are walked
+                spot = a
+                while spot <= n and street >> spot & 1:
+                    spot += 1
+                if spot > n:
+                    continue
+                for present, absent, after in _moves(lot, a, car, n):
+                    state = (street | 1 << spot, after)
+                    target = following.setdefault(state, len(following))
+                    outcomes[-1].append((present, absent, target))
+        levels.append(following)
+        moves.append(outcomes)
+    return levels, moves
+
+
+def _moves(lot, a, car, n):
+    """
+    the notebook's are_valid step for one car as (present, absent, lot) cubes;
+    cubes where the run fails are left out
+    """
+    outcomes = []
+    for parked, present, absent, after in _try(lot, a, car, n, 0, 0):
+        if parked:
+            outcomes.append((present, absent, after))
+            continue
+        for parked, present, absent, after in _try(lot, a + 1, car, n, present, absent):
+            if parked:
+                outcomes.append((present, absent, after))
+            elif a + 1 != n:
+                outcomes.append((present, absent, lot))
+    return outcomes
+
+
+def _try(lot, spot, car, n, present, absent):
+    # can_park split by the friendships it asks about
+    if spot < 0 or spot >= n:
+        return [(False, present, absent, lot)]
+    if lot[spot]:
+        spot += 1
+        if spot >= n:
+            return [(False, present, absent, lot)]
+    outcomes = []
+    for side in (spot - 1, spot + 1):
+        if 0 <= side < n and lot[side]:
+            bit = 1 << (lot[side] - 1)
+            if absent & bit:
+                return outcomes + [(False, present, absent, lot)]
+            if not present & bit:
+                outcomes.append((False, present, absent | bit, lot))
+                present |= bit
+    parked = list(lot)
+    parked[spot] = car
+    return outcomes + [(True, present, absent, tuple(parked))]
+
+
+_cubes = {}
+
+def _cube(present, absent, width):
+    # which of the 2^width friendship masks of a car fall in a cube
+    if (present, absent, width) not in _cubes:
+        masks = np.arange(2**width)
+        _cubes[present, absent, width] = ((masks & present) == present) & ((masks & absent) == 0)
+    return _cubes[present, absent, width]
+
+
+def _car_order(n):
+    """
+    for every graph bitmask, its index in graph_sizes' internal layout,
+    where car c's friendships with cars 1..c-1 sit at bits C(c - 1, 2) on
+    """
+    graphs = np.arange(2**comb(n, 2), dtype=np.int64)
+    order = np.zeros_like(graphs)
+    for i, (a, b) in enumerate(edges(n)):
+        order |= ((graphs >> i) & 1) << (comb(b - 1, 2) + a - 1)
+    return order
+
+
+# list versions with the notebook's names
+
+def generate_all_graphs(n):
+    possible_edges = edges(n)
+    return [list(subset) for r in range(len(possible_edges) + 1) for subset in combinations(possible_edges, r)]
+
+def are_valid(edges, pf):
+    return bool(validate_friendship([pf], [tuple(edge) for edge in edges])[0][0])
+
+def generate_friendship_pfs(n):
+    # graphs without a single friendship PF are left out, as in the notebook
+    counts = graph_sizes(n)
+    pfs = np.concatenate(list(iter_parking_function_arrays(0, n, n, n)))
+    result = {}
+    for graph in generate_all_graphs(n):
+        mask = graph_mask(graph, n)
+        if counts[mask]:
+            result[tuple(graph)] = pfs[validate_friendship(pfs, mask)[0]].tolist()
+    return result
@@ -0,0 +1,310 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+from math import comb
+
+from counting import count
+from subclasses import CLASSES
+
+# the notebook's homomesy search, (family x bijection x statistic x n), as
+# independent tasks on a process pool. one task is one (family, n, map): the
+# orbits are decomposed once and every statistic checked on them. results
+# and timings go to a SQLite file as each task finishes, so a restart only
+# runs what is missing, and tasks run smallest set first so the early rows
+# fill in within seconds.
+#
+# friendship PFs are one set per graph on the n cars, as in the notebook
+# (which skips the empty graph), so the family expands to 2^C(n, 2) - 1 sets
+# named friendship:<graph bitmask>; it only runs when asked for.
+#
+#   python grid.py run --n-max 7 [--family prime ...] [--map 293 ...] [--workers 4]
+#   python grid.py report [--homomesic]
+
+DATABASE = os.environ.get('PF_GRID_DB') or os.path.join(
+    os.path.expanduser('~'), '.cache', 'parking_functions', 'grid.sqlite')
+FAMILIES = ('classical',) + tuple(CLASSES) + ('friendship',)
+DEFAULT_FAMILIES = FAMILIES[:-1]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    family TEXT, n INTEGER, map INTEGER, by_length INTEGER,
+    status TEXT, rows INTEGER, seconds REAL, finished REAL, error TEXT,
+    PRIMARY KEY (family, n, map, by_length)
+);
+CREATE TABLE IF NOT EXISTS results (
+    family TEXT, n INTEGER, map INTEGER, stat INTEGER, by_length INTEGER,
+    homomesic INTEGER, certificate TEXT,
+    PRIMARY KEY (family, n, map, stat, by_length)
+);
+"""
+
+
+def connect(path=DATABASE):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.executescript(_SCHEMA)
+    return connection
+
+
+def expand(families, ns, maps, by_length=False):
+    """
+    every (family, n, map, by_length) task, cheapest first: the cost of a
+    task grows with the size of its set, which counting gives without
+    enumerating
+    """
+    tasks = [(name, n, map_id, by_length)
+             for family in families for n in ns for name in _sets(family, n) for map_id in maps]
+    return sorted(tasks, key=lambda task: (
+        _size(task[0], task[1]), task[1], FAMILIES.index(task[0].split(':')[0]), task[0], task[2]))
+
+
+def _sets(family, n):
+    if family == 'friendship':
+        return [f"friendship:{graph}" for graph in range(1, 2**comb(n, 2))]
+    return [family]
+
+
+def _size(name, n):
+    if name.startswith('friendship:'):
+        return int(_graph_sizes(n)[int(name.split(':')[1])])
+    return count(name, n)
+
+
+@lru_cache(maxsize=None)
+def _graph_sizes(n):
+    from friendship import graph_sizes
+    return graph_sizes(n)
+
+
+def pending(connection, tasks, stats):
+    """
+    tasks whose results are not all in the database yet, each with the
+    statistics it still has to check. a map that is not a bijection on a
+    set is recorded once and not tried again
+    """
+    done = {}
+    for family, n, map_id, stat, by_length in connection.execute(
+        "SELECT family, n, map, stat, by_length FROM results"
+    ):
+        done.setdefault((family, n, map_id, bool(by_length)), set()).add(stat)
+    closed = {
+        (family, n, map_id, bool(by_length))
+        for family, n, map_id, by_length in connection.execute(
+            "SELECT family, n, map, by_length FROM tasks WHERE status = 'not_bijective'"
+        )
+    }
+    todo = []
+    for task in tasks:
+        missing = [stat for stat in stats if stat not in done.get(task, ())]
+        if missing and task not in closed:
+            todo.append((task, missing))
+    return todo
+
+
+def prepare(n, families, store_root=None):
+    """
+    makes sure every family's set for n is in the store, classical first
+    since the subclasses are cut from it; runs before any task of that n so
+    workers never build the same file twice
+    """
+    from store import PFStore
+
+    store = PFStore(store_root)
+    # friendship sets are filtered per graph in the task itself
+    for family in sorted(families, key=lambda family: family != 'classical'):
+        if family != 'friendship':
+            store.load(family, n)
+    return n
+
+
+def run_task(family, n, map_id, by_length, stats, store_root=None):
+    """
+    (status, rows, seconds, error, [(stat, homomesic, certificate json)])
+    for one task; runs in a worker process
+    """
+    import numpy as np
+    from findstat_local import bijections, statistics
+    from homomesy import check, evaluate
+    from orbits import orbit_decomposition
+    from store import PFStore
+
+    started = time.perf_counter()
+    if family.startswith('friendship:'):
+        from friendship import friendship_pfs
+        pfs = friendship_pfs(n, int(family.split(':')[1]))
+    else:
+        pfs = np.asarray(PFStore(store_root).load(family, n))
+    try:
+        orbits = orbit_decomposition(pfs, bijections()[map_id])
+    except ValueError as error:
+        return 'not_bijective', len(pfs), time.perf_counter() - started, str(error), []
+
+    kernels = statistics()
+    results = []
+    for stat in stats:
+        certificate = check(pfs, orbits, evaluate(kernels[stat], pfs), by_length=by_length)
+        if certificate is not None:
+            certificate = json.dumps({
+                'orbits': certificate.orbits,
+                'values': certificate.values,
+                'averages': [str(average) for average in certificate.averages],
+            })
+        results.append((stat, certificate is None, certificate))
+    return 'done', len(pfs), time.perf_counter() - started, None, results
+
+
+def record(connection, task, outcome):
+    """
+    one task's results and timing, in a single transaction
+    """
+    family, n, map_id, by_length = task
+    status, rows, seconds, error, results = outcome
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (family, n, map_id, int(by_length), status, rows, round(seconds, 4), time.time(), error),
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(family, n, map_id, stat, int(by_length), int(homomesic), certificate)
+             for stat, homomesic, certificate in results],
+        )
+
+
+def run(families=DEFAULT_FAMILIES, ns=range(1, 7), maps=None, stats=None, by_length=False,
+        workers=None, path=DATABASE, store_root=None, progress=None):
+    """
+    runs every task that is not done yet; progress(task, outcome, done,
+    total) is called as each one is recorded. returns (tasks run, failed).
+    ids without a local bijection or statistic are a ValueError up front,
+    since their tasks would only ever fail
+    """
+    from findstat_local import bijections, statistics
+
+    maps = sorted(bijections()) if maps is None else list(maps)
+    stats = sorted(statistics()) if stats is None else list(stats)
+    unknown = [f"Mp{id:05d}" for id in maps if id not in bijections()]
+    unknown += [f"St{id:06d}" for id in stats if id not in statistics()]
+    if unknown:
+        raise ValueError(f"no local kernel for {', '.join(unknown)}")
+    unknown = [family for family in families if family not in FAMILIES]
+    if unknown:
+        raise ValueError(f"unknown families {', '.join(unknown)}")
+    connection = connect(path)
+    todo = pending(connection, expand(families, ns, maps, by_length), stats)
+    if not todo:
+        return 0, 0
+
+    # n -> its tasks, released to the pool once that n's sets are built
+    waiting = {}
+    for task, missing in todo:
+        waiting.setdefault(task[1], []).append((task, missing))
+    done = failed = 0
+
+    def finish(task, outcome):
+        nonlocal done, failed
+        record(connection, task, outcome)
+        done += 1
+        failed += outcome[0] == 'failed'
+        if progress is not None:
+            progress(task, outcome, done, len(todo))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = {pool.submit(prepare, n, families, store_root): ('prepare', n) for n in waiting}
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                kind, item = running.pop(future)
+                try:
+                    outcome = future.result()
+                except Exception as error:
+                    # recorded as failed and retried on the next run
+                    outcome = ('failed', None, 0.0, f"{type(error).__name__}: {error}", [])
+                if kind == 'task':
+                    finish(item, outcome)
+                elif outcome != item:
+                    for task, _ in waiting.pop(item):
+                        finish(task, outcome)
+                else:
+                    for task, missing in waiting.pop(item):
+                        running[pool.submit(run_task, *task, missing, store_root)] = ('task', task)
+    connection.close()
+    return done, failed
+
+
+def report(path=DATABASE, homomesic_only=False):
+    """
+    (family, n, map, stat, by_length, homomesic) rows in grid order
+    """
+    connection = connect(path)
+    query = "SELECT family, n, map, stat, by_length, homomesic FROM results"
+    if homomesic_only:
+        query += " WHERE homomesic = 1"
+    rows = connection.execute(query + " ORDER BY family, n, map, stat").fetchall()
+    connection.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="resumable homomesy search over the notebook's grid")
+    parser.add_argument('--db', default=DATABASE, help="SQLite file the results are kept in")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="run every task not in the database yet")
+    run_parser.add_argument('--n-min', type=int, default=1)
+    run_parser.add_argument('--n-max', type=int, default=6)
+    run_parser.add_argument('--family', action='append', choices=FAMILIES,
+                            help="(default: every family but friendship)")
+    run_parser.add_argument('--map', action='append', type=int, help="FindStat map id (default: every local bijection)")
+    run_parser.add_argument('--stat', action='append', type=int, help="FindStat statistic id (default: all local ones)")
+    run_parser.add_argument('--by-length', action='store_true', help="homometry: only compare orbits of equal length")
+    run_parser.add_argument('--workers', type=int, help="processes (default: one per CPU)")
+
+    report_parser = commands.add_parser('report', help="print the results so far")
+    report_parser.add_argument('--homomesic', action='store_true', help="only the homomesic pairs")
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'report':
+        connection = connect(args.db)
+        for status, tasks, seconds in connection.execute(
+            "SELECT status, COUNT(*), SUM(seconds) FROM tasks GROUP BY status ORDER BY status"
+        ):
+            print(f"{status:14} {tasks:6} tasks {seconds or 0:10.1f} s")
+        connection.close()
+        for family, n, map_id, stat, by_length, homomesic in report(args.db, args.homomesic):
+            print(f"{family:16} n={n:<3} Mp{map_id:05d} St{stat:06d}"
+                  f"{' by length' if by_length else ''}  {'homomesic' if homomesic else '-'}")
+        return 0
+
+    def progress(task, outcome, done, total):
+        family, n, map_id, by_length = task
+        status, rows, seconds, error, results = outcome
+        print(f"[{done}/{total}] {family:16} n={n:<3} Mp{map_id:05d} {status:13} "
+              f"{rows if rows is not None else '-':>9} rows {seconds:8.2f} s  "
+              f"{sum(homomesic for _, homomesic, _ in results)} homomesic"
+              f"{'  ' + error if status == 'failed' else ''}", flush=True)
+
+    try:
+        ran, failed = run(
+            families=tuple(args.family or DEFAULT_FAMILIES), ns=range(args.n_min, args.n_max + 1),
+            maps=args.map, stats=args.stat, by_length=args.by_length, workers=args.workers,
+            path=args.db, progress=progress,
+        )
+    except ValueError as error:
+        parser.error(str(error))
+    if not ran:
+        print("nothing to do: every task is in the database")
+    else:
+        print(f"{ran} tasks run, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
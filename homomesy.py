@@ -0,0 +1,117 @@
+from fractions import Fraction
+
+import numpy as np
+
+from orbits import decompose_all
+
+
+class Certificate:
+    """
+    two orbits whose statistic averages differ, which disproves homomesy
+    (or homometry, when both orbits have the same length)
+    """
+
+    def __init__(self, pfs, orbits, values, first, second):
+        self.first, self.second = first, second
+        self.orbits = tuple(
+            [tuple(int(x) for x in pf) for pf in orbits.members(pfs, i)] for i in (first, second)
+        )
+        self.values = tuple(
+            [int(x) for x in np.asarray(values)[orbits[i]]] for i in (first, second)
+        )
+
+    @property
+    def averages(self):
+        return tuple(Fraction(sum(values), len(values)) for values in self.values)
+
+    def __repr__(self):
+        return "Certificate(orbit {} avg {}, orbit {} avg {})".format(
+            self.first, self.averages[0], self.second, self.averages[1]
+        )
+
+    def disproof_args(self, map_id, stat_id, map_name, stat_name):
+        """
+        arguments for the notebook's generate_disproof, in order
+        """
+        args = [map_id, stat_id, map_name, stat_name, len(self.orbits[0][0])]
+        args += [self.orbits[0][0], self.orbits[1][0]]
+        args += [", ".join(str(pf) for pf in orbit) for orbit in self.orbits]
+        for values, average in zip(self.values, self.averages):
+            numerator = str(values[0]) if len(values) == 1 else "(" + "+".join(map(str, values)) + ")"
+            args += [numerator, len(values), float(average)]
+        return tuple(args)
+
+
+def evaluate(statistic, pfs):
+    """
+    a vectorized statistic's value on every row, checked to be integers
+    """
+    values = np.asarray(statistic(pfs))
+    if values.shape != (len(pfs),):
+        raise ValueError("a statistic must return one value per row")
+    if not np.issubdtype(values.dtype, np.integer):
+        raise ValueError("statistics must be integer valued for exact averages")
+    return values
+
+
+def find_counterexample(orbits, values, by_length=False):
+    """
+    first pair of orbits whose averages differ, as (i, j), or None if every
+    orbit has the same average. averages are compared exactly, as
+    sum_i * len_j == sum_j * len_i. by_length only compares orbits of
+    equal length (homometry instead of homomesy)
+    """
+    if not len(orbits):
+        return None
+    sums = orbits.sums(values).astype(np.int64)
+    lengths = orbits.lengths
+    if int(np.abs(sums).max()) * int(lengths.max()) >= 2**62:
+        sums, lengths = sums.astype(object), lengths.astype(object)
+
+    if by_length:
+        # compare every orbit with the first orbit of its length
+        _, first_of_length, bucket = np.unique(orbits.lengths, return_index=True, return_inverse=True)
+        reference = first_of_length[bucket]
+    else:
+        reference = np.zeros(len(orbits), dtype=np.int64)
+
+    differs = sums * lengths[reference] != sums[reference] * lengths
+    if not differs.any():
+        return None
+    i = int(np.argmax(differs))
+    return int(reference[i]), i
+
+
+def check(pfs, orbits, values, by_length=False):
+    """
+    None if the statistic values are homomesic on the orbits, else a Certificate
+    """
+    pair = find_counterexample(orbits, values, by_length=by_length)
+    if pair is None:
+        return None
+    return Certificate(pfs, orbits, values, *pair)
+
+
+def sweep(pfs, bijections, statistics, by_length=False):
+    """
+    checks every (map, statistic) pair on a set of PFs, given dicts of id ->
+    vectorized map and id -> vectorized statistic. each map is decomposed
+    once and each statistic evaluated once; yields (map_id, stat_id,
+    certificate), with certificate None for the pairs that are homomesic
+    """
+    pfs = np.asarray(pfs)
+    values = {stat_id: evaluate(statistic, pfs) for stat_id, statistic in statistics.items()}
+    for map_id, orbits in decompose_all(pfs, bijections).items():
+        for stat_id in statistics:
+            yield map_id, stat_id, check(pfs, orbits, values[stat_id], by_length=by_length)
+
+
+def homomesic_pairs(pfs, bijections, statistics, by_length=False):
+    """
+    (map_id, stat_id) for every homomesic pair, like run_homomesic_on_PFs prints
+    """
+    return [
+        (map_id, stat_id)
+        for map_id, stat_id, certificate in sweep(pfs, bijections, statistics, by_length=by_length)
+        if certificate is None
+    ]
@@ -0,0 +1,199 @@
+import json
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from threading import Lock
+
+# timing spans and counters for the visualizer's hot path. every span is
+# added to the process-wide METRICS (p50/p95 per variant and stage), to the
+# trace of the session that ran it (for the debug panel) and, given
+# PF_METRICS_LOG, appended to that file as one JSON object per line
+
+LOG_PATH = os.environ.get('PF_METRICS_LOG')
+# durations kept per (variant, stage) for the percentiles
+WINDOW = 2048
+# events kept per session trace
+TRACE_EVENTS = 256
+
+
+class Metrics:
+    """
+    thread-safe aggregates over every session of the process: a sliding
+    window of durations per (variant, span) and totals per (variant, counter)
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._durations = defaultdict(lambda: deque(maxlen=self.window))
+        self._counts = defaultdict(int)
+        self._lock = Lock()
+
+    def add(self, variant, name, seconds):
+        with self._lock:
+            self._durations[variant, name].append(seconds)
+
+    def incr(self, variant, name, value=1):
+        with self._lock:
+            self._counts[variant, name] += value
+
+    def summary(self):
+        """
+        variant -> {'spans': name -> stats in ms, 'counters': name -> total}
+        """
+        import numpy as np
+
+        with self._lock:
+            durations = {key: np.array(values) for key, values in self._durations.items() if values}
+            counts = dict(self._counts)
+        summary = defaultdict(lambda: {'spans': {}, 'counters': {}})
+        for (variant, name), values in sorted(durations.items(), key=lambda item: str(item[0])):
+            p50, p95 = np.percentile(values, [50, 95]) * 1e3
+            summary[str(variant)]['spans'][name] = {
+                'count': len(values), 'p50_ms': round(float(p50), 3), 'p95_ms': round(float(p95), 3),
+                'mean_ms': round(float(values.mean()) * 1e3, 3), 'max_ms': round(float(values.max()) * 1e3, 3),
+            }
+        for (variant, name), total in counts.items():
+            summary[str(variant)]['counters'][name] = total
+        return dict(summary)
+
+    def to_json(self):
+        return json.dumps({'time': time.time(), 'variants': self.summary()}, indent=1)
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._counts.clear()
+
+
+class Trace:
+    """
+    the recent spans and counters of one session, newest last
+    """
+
+    def __init__(self, max_events=TRACE_EVENTS):
+        self.events = deque(maxlen=max_events)
+        self.run = 0
+
+    def last_run(self):
+        return [event for event in self.events if event['run'] == self.run]
+
+
+# (trace, variant) of the script run on this thread
+_current = ContextVar('instrument', default=(None, None))
+_log_lock = Lock()
+
+
+def begin(session_state=None, variant=None):
+    """
+    starts one script run: later spans on this thread are tagged with the
+    variant and recorded in the session's trace (kept in session_state)
+    """
+    trace = None
+    if session_state is not None:
+        if 'perf_trace' not in session_state:
+            session_state['perf_trace'] = Trace()
+        trace = session_state['perf_trace']
+        trace.run += 1
+    _current.set((trace, variant))
+    return trace
+
+
+@contextmanager
+def span(name, **fields):
+    """
+    times the block; the span is still recorded if it raises
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as error:
+        fields['error'] = type(error).__name__
+        raise
+    finally:
+        _record('span', name, time.perf_counter() - started, fields)
+
+
+def timed(name):
+    """
+    decorator version of span
+    """
+    def wrap(function):
+        @wraps(function)
+        def timed_function(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return timed_function
+    return wrap
+
+
+def count(name, value=1, **fields):
+    _record('counter', name, value, fields)
+
+
+def _record(kind, name, value, fields):
+    trace, variant = _current.get()
+    if kind == 'span':
+        METRICS.add(variant, name, value)
+    else:
+        METRICS.incr(variant, name, value)
+    if trace is None and LOG_PATH is None:
+        return
+    event = {'kind': kind, 'name': name, 'variant': variant, 'time': time.time(), **fields}
+    if kind == 'span':
+        event['ms'] = round(value * 1e3, 3)
+    else:
+        event['value'] = value
+    if trace is not None:
+        event['run'] = trace.run
+        trace.events.append(event)
+    if LOG_PATH is not None:
+        line = json.dumps(event, default=str)
+        with _log_lock, open(LOG_PATH, 'a') as f:
+            f.write(line + '\n')
+
+
+def debug_enabled(query_params=None):
+    """
+    the panel shows with ?debug=1 in the URL or PF_DEBUG_PANEL=1
+    """
+    if os.environ.get('PF_DEBUG_PANEL', '') not in ('', '0'):
+        return True
+    return query_params is not None and query_params.get('debug', '') not in ('', '0')
+
+
+def show_panel(trace):
+    """
+    the session's last run and the process-wide percentiles, in an expander
+    """
+    import pandas as pd
+    import streamlit as st
+
+    if not debug_enabled(st.query_params):
+        return
+    with st.expander("Performance", expanded=False):
+        events = [] if trace is None else trace.last_run()
+        spans = [event for event in events if event['kind'] == 'span']
+        counters = [event for event in events if event['kind'] == 'counter']
+        st.markdown("**This run**")
+        if spans:
+            st.dataframe(pd.DataFrame(spans)[['name', 'ms']], hide_index=True)
+        if counters:
+            totals = pd.DataFrame(counters).groupby('name', sort=False)['value'].sum().reset_index()
+            st.dataframe(totals, hide_index=True)
+
+        st.markdown("**All sessions**")
+        rows = [
+            {'variant': variant, 'span': name, **stats}
+            for variant, entry in METRICS.summary().items()
+            for name, stats in entry['spans'].items()
+        ]
+        if rows:
+            st.dataframe(pd.DataFrame(rows), hide_index=True)
+        st.download_button("Export JSON", METRICS.to_json(), file_name="pf_metrics.json", mime="application/json")
+
+
+# shared by every session of the app
+METRICS = Metrics()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# headless load test: N sessions spread over the four pages, each loading
+# its page and then entering random preferences and clicking Generate a few
+# times. AppTest keeps one runtime per process, so sessions are split over
+# worker processes; within a worker they take turns, one script run at a
+# time, the way the script threads of one Streamlit server share the GIL.
+# they cannot run on threads instead: every AppTest run swaps in its own
+# global Runtime instance. so at most `workers` script runs are ever in
+# flight, however many sessions there are, and the results report that
+# bound and the mean number of runs in flight (busy time over wall time).
+# runs/s per worker is about what one replica serves, and the latencies are
+# whole script runs as a session sees them, without queueing behind other
+# sessions.
+#
+#   python loadtest.py [--sessions 16] [--workers 4] [--actions 5] [--json results.json]
+
+PAGES = ('pages/classical.py', 'pages/k_naples.py', 'pages/l_interval.py', 'pages/unit_interval.py')
+TIMEOUT = 120
+
+
+def serve(sessions, actions, timeout=TIMEOUT):
+    """
+    one worker: every (page, seed) session loads its page, then they take
+    turns clicking Generate `actions` times with random preferences;
+    returns (page, kind, ms, ok) per script run
+    """
+    from streamlit.testing.v1 import AppTest
+
+    root = os.path.dirname(os.path.abspath(__file__))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    runs = []
+
+    def timed_run(page, kind, run):
+        started = time.perf_counter()
+        try:
+            ok = not run().exception
+        except Exception:
+            ok = False
+        runs.append((page, kind, (time.perf_counter() - started) * 1e3, ok))
+        return ok
+
+    users = []
+    for page, seed in sessions:
+        app = AppTest.from_file(os.path.join(root, page), default_timeout=timeout)
+        if timed_run(page, 'load', app.run):
+            users.append((page, app, np.random.default_rng(seed)))
+    for _ in range(actions):
+        for page, app, rng in users:
+            _fill(app, page, rng)
+            generate = next(button for button in app.button if button.label == "Generate")
+            timed_run(page, 'generate', generate.click().run)
+    return runs
+
+
+def _fill(app, page, rng):
+    """
+    random preferences for the page's inputs, at the page's current n
+    """
+    def tuple_text(values):
+        return "(" + ", ".join(str(int(value)) for value in values) + ")"
+
+    if page.endswith('l_interval.py'):
+        n = len(app.text_input[0].value.split(","))
+        alpha = rng.integers(1, n + 1, n)
+        beta = np.minimum(alpha + rng.integers(0, n, n), n)
+        app.text_input[0].set_value(tuple_text(alpha))
+        app.text_input[1].set_value(tuple_text(beta))
+        return
+    n = app.selectbox[0].value if app.selectbox else len(app.text_input[0].value.split(","))
+    app.text_input[0].set_value(tuple_text(rng.integers(1, n + 1, n)))
+
+
+def load_test(sessions=8, actions=5, workers=None, pages=PAGES, timeout=TIMEOUT):
+    """
+    runs the sessions on `workers` processes at once; returns throughput,
+    the concurrency actually reached and per (page, kind) latency
+    percentiles
+    """
+    workers = max(1, min(sessions, workers or os.cpu_count() or 1))
+    shares = [[] for _ in range(workers)]
+    for i in range(sessions):
+        shares[i % workers].append((pages[i % len(pages)], i))
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(serve, share, actions, timeout) for share in shares]
+        runs = [run for future in futures for run in future.result()]
+    wall = time.perf_counter() - started
+
+    groups = {}
+    for page, kind, ms, ok in runs:
+        groups.setdefault((page, kind), []).append((ms, ok))
+    latency = []
+    for (page, kind), values in sorted(groups.items()):
+        ms = np.array([value for value, _ in values])
+        p50, p95 = np.percentile(ms, [50, 95])
+        latency.append({
+            'page': page, 'kind': kind, 'runs': len(values),
+            'errors': sum(not ok for _, ok in values),
+            'p50_ms': round(float(p50), 1), 'p95_ms': round(float(p95), 1), 'max_ms': round(float(ms.max()), 1),
+        })
+    return {
+        'sessions': sessions, 'workers': workers, 'actions': actions, 'wall_s': round(wall, 3),
+        'max_in_flight': workers, 'mean_in_flight': round(sum(ms for _, _, ms, _ in runs) / 1e3 / wall, 2),
+        'runs': len(runs), 'errors': sum(not ok for *_, ok in runs),
+        'runs_per_s': round(len(runs) / wall, 2), 'runs_per_s_per_worker': round(len(runs) / wall / workers, 2),
+        'latency': latency,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="concurrent-session load test for the visualizer pages")
+    parser.add_argument('--sessions', type=int, default=8, help="sessions, taking turns within each worker")
+    parser.add_argument('--workers', type=int, help="processes, like replicas (default: one per CPU)")
+    parser.add_argument('--actions', type=int, default=5, help="Generate clicks per session")
+    parser.add_argument('--page', action='append', choices=PAGES, help="only these pages (default: all four)")
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help="seconds allowed per script run")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = load_test(args.sessions, args.actions, args.workers, tuple(args.page or PAGES), args.timeout)
+    for row in results['latency']:
+        print(f"{row['page']:26} {row['kind']:9} {row['runs']:5} runs  p50 {row['p50_ms']:8.1f} ms"
+              f"  p95 {row['p95_ms']:8.1f} ms  max {row['max_ms']:8.1f} ms"
+              f"{'  ' + str(row['errors']) + ' errors' if row['errors'] else ''}")
+    print(f"{results['runs']} runs by {results['sessions']} sessions on {results['workers']} workers "
+          f"in {results['wall_s']} s: {results['runs_per_s']} runs/s "
+          f"({results['runs_per_s_per_worker']} per worker), {results['errors']} errors")
+    print(f"at most {results['max_in_flight']} script runs in flight, "
+          f"{results['mean_in_flight']} on average")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=1)
+    return 1 if results['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
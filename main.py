@@ -1,5 +1,7 @@
 import streamlit as st
 
+from assets import static_image
+
 # hide sidebar and set tab config
 st.set_page_config(
     page_title="PF Visualizer", 
@@ -65,6 +67,10 @@ with col2:
     if st.button(r"Unit-Interval Parking Functions", use_container_width=True):
         st.switch_page("pages/unit_interval.py")
 
+# many preference lists at once, no animation
+if st.button("Bulk Validation", use_container_width=True):
+    st.switch_page("pages/bulk_validation.py")
+
 st.markdown("""
 ---
 """)
@@ -83,4 +89,4 @@ To learn more about parking functions, check out this <a href="https://www.youtu
 """, unsafe_allow_html=True)
 
 # image
-st.image("imgs/example.png", caption="")
+st.image(static_image("imgs/example.png"), caption="")
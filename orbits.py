@@ -0,0 +1,132 @@
+import numpy as np
+
+
+class Orbits:
+    """
+    orbits of a bijection on rows 0..N-1 of a PF array, stored as offset/index
+    arrays: orbit i is indices[offsets[i]:offsets[i + 1]], listed x, f(x), f(f(x)), ...
+    """
+
+    def __init__(self, offsets, indices):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.indices[self.offsets[i]:self.offsets[i + 1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def sums(self, values):
+        """
+        per-orbit sum of a statistic given its value on every row
+        """
+        values = np.asarray(values)
+        if not len(self):
+            return values[:0]
+        return np.add.reduceat(values[self.indices], self.offsets[:-1])
+
+    def members(self, pfs, i):
+        """
+        the rows of orbit i, in orbit order
+        """
+        return np.asarray(pfs)[self[i]]
+
+    def restrict(self, keep):
+        """
+        orbits of a subset, given a boolean mask over all rows: each orbit keeps
+        its members in order and emptied orbits are dropped, like the
+        notebook's orbit_redefinition
+        """
+        keep = np.asarray(keep, dtype=bool)
+        kept = keep[self.indices]
+        counts = np.add.reduceat(kept.astype(np.int64), self.offsets[:-1]) if len(self) else kept[:0]
+        counts = counts[counts > 0]
+        return Orbits(np.concatenate(([0], np.cumsum(counts))), self.indices[kept])
+
+
+def encode(pfs):
+    """
+    one int64 key per row, in the same order as the rows sort lexicographically
+    """
+    pfs = np.asarray(pfs, dtype=np.int64)
+    rows, n = pfs.shape
+    base = int(pfs.max(initial=0)) + 1
+    if base**n >= 2**63:
+        raise ValueError("preference tuples are too long to encode as int64")
+    keys = np.zeros(rows, dtype=np.int64)
+    for column in range(n):
+        keys = keys*base + pfs[:, column]
+    return keys
+
+
+def index_map(pfs, images):
+    """
+    position in pfs of every row of images; every image must be a row of pfs
+    """
+    pfs, images = np.asarray(pfs), np.asarray(images)
+    stacked = encode(np.concatenate((pfs, images)))
+    keys, image_keys = stacked[:len(pfs)], stacked[len(pfs):]
+
+    order = np.argsort(keys, kind='stable')
+    found = np.searchsorted(keys, image_keys, sorter=order)
+    found = np.minimum(found, len(keys) - 1)
+    positions = order[found]
+    if len(keys) and not np.array_equal(keys[positions], image_keys):
+        raise ValueError("the set is not closed under the map")
+    return positions
+
+
+def cycles(permutation):
+    """
+    traces every cycle of a permutation of 0..N-1 once, using a visited bitmap
+    """
+    successor = np.asarray(permutation, dtype=np.int64).tolist()
+    visited = bytearray(len(successor))
+    offsets, indices = [0], []
+    for start in range(len(successor)):
+        if visited[start]:
+            continue
+        element = start
+        while not visited[element]:
+            visited[element] = 1
+            indices.append(element)
+            element = successor[element]
+        if element != start:
+            raise ValueError("the map is not a bijection on the set")
+        offsets.append(len(indices))
+    return Orbits(offsets, indices)
+
+
+def orbit_decomposition(pfs, bijection):
+    """
+    orbits of a vectorized bijection (2-D PF array -> 2-D PF array) on a set of PFs
+    """
+    pfs = np.asarray(pfs)
+    return cycles(index_map(pfs, bijection(pfs)))
+
+
+def decompose_all(pfs, bijections):
+    """
+    one decomposition per bijection (a dict of id -> map), to be reused for
+    every statistic instead of recomputing it per (map, statistic) pair
+    """
+    return {map_id: orbit_decomposition(pfs, bijection) for map_id, bijection in bijections.items()}
+
+
+def rotate_front_to_back(pfs):
+    # (a_1, a_2, ..., a_n) -> (a_2, ..., a_n, a_1)
+    return np.roll(pfs, -1, axis=1)
+
+
+def rotate_back_to_front(pfs):
+    # (a_1, ..., a_{n-1}, a_n) -> (a_n, a_1, ..., a_{n-1})
+    return np.roll(pfs, 1, axis=1)
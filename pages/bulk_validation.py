@@ -0,0 +1,94 @@
+from bulk import VARIANTS, read_preferences, results_csv, results_frame, validate
+from instrument import begin, count, show_panel, span
+import streamlit as st
+
+# SETUP
+
+# hide sidebar and set tab config
+st.set_page_config(
+    page_title="Bulk Validation",
+    page_icon="🚗",
+    initial_sidebar_state="collapsed"
+)
+
+# timings of this run, for the optional debug panel (?debug=1)
+trace = begin(st.session_state, "bulk")
+
+# center title
+col1, col2, col3 = st.columns([2.5, 6, 1])
+
+with col2:
+    st.title("Bulk Validation")
+
+st.markdown(r"""
+Upload a file of preference lists and every row is checked at once, without drawing a street:
+- **.csv / .txt**: one list per line, like `1,1,2` or `(1, 1, 2)`; a header line is skipped.
+- **.npy**: a 2-D integer array with one list per row.
+
+For $l$-Interval, each row holds $\alpha$ followed by $\beta$ ($2n$ values). Unit-Interval uses $\beta_i = \alpha_i + 1$.
+Lists of up to 62 cars are supported, and $l$-Interval lists of any length.
+""")
+
+st.write("---")
+
+variant = st.selectbox("Variant", list(VARIANTS), format_func=VARIANTS.get)
+k = None
+if variant == "k_naples":
+    k = st.number_input(r"Steps back ($k$)", min_value=0, max_value=61, value=1, step=1)
+
+upload = st.file_uploader("Preference lists", type=["csv", "txt", "npy"])
+
+# results are kept per file and parameters, so paging doesn't validate again
+if upload is not None and st.button("Validate"):
+    try:
+        with span("parse"):
+            prefs = read_preferences(upload.getvalue(), upload.name)
+        progress = st.progress(0.0, text=f"Validating {len(prefs):,} rows")
+        with span("validate", rows=len(prefs)):
+            valid, spots, failing = validate(
+                variant, prefs, k=k,
+                progress=lambda done, total: progress.progress(done / total, text=f"Validated {done:,} of {total:,} rows"),
+            )
+        count("rows", len(prefs))
+        st.session_state.bulk_results = ((upload.file_id, variant, k), prefs, valid, spots, failing)
+        st.session_state.bulk_page = 1
+    except ValueError as error:
+        st.session_state.pop("bulk_results", None)
+        st.error(str(error))
+
+key, *results = st.session_state.get("bulk_results", (None,))
+if upload is not None and results and key == (upload.file_id, variant, k):
+    prefs, valid, spots, failing = results
+    rows = len(prefs)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Rows", f"{rows:,}")
+    col2.metric("Valid", f"{int(valid.sum()):,}")
+    col3.metric("Not valid", f"{rows - int(valid.sum()):,}")
+
+    # one page of the table at a time
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", [25, 100, 500], index=1)
+    pages = max(1, -(-rows // page_size))
+    st.session_state.bulk_page = min(st.session_state.get("bulk_page", 1), pages)
+    with col2:
+        page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key="bulk_page")
+
+    with span("table"):
+        st.dataframe(
+            results_frame(prefs, valid, spots, failing, (page - 1) * page_size, page * page_size),
+            hide_index=True,
+        )
+
+    def export():
+        # only built when the download is asked for, not on every Validate
+        with span("export"):
+            return results_csv(prefs, valid, spots, failing)
+
+    st.download_button(
+        "Download results (CSV)", export,
+        file_name=f"{upload.name.rsplit('.', 1)[0]}_{variant}_results.csv", mime="text/csv",
+    )
+
+show_panel(trace)
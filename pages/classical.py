@@ -1,7 +1,9 @@
-from animate import simulate_classical_parking, plot_parking_state
+from animate import simulate_classical_parking
+from assets import static_image
+from instrument import begin, show_panel, span
+from player import show_animation
+from sampling import random_parking_function
 import streamlit as st
-import matplotlib.pyplot as plt
-import time
 
 # SETUP
 
@@ -12,6 +14,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# timings of this run, for the optional debug panel (?debug=1)
+trace = begin(st.session_state, "classical")
+
 # center title
 col1, col2, col3 = st.columns([3, 6, 1])
 
@@ -27,7 +32,7 @@ We have $n$ cars, each with a preferred spot. They arrive in order $c_1, c_2, \d
 
 st.markdown("Here's another example image from our mentor's video linked on our the home page for a better idea: ")
 
-st.image("imgs/classical_case.png", caption="")
+st.image(static_image("imgs/classical_case.png"), caption="")
 
 # adj styling
 st.markdown("""
@@ -56,18 +61,26 @@ n = st.selectbox(fr"Select the number of cars ($n$)", list(range(2, 11)), index=
 st.markdown("### Enter the preferences as a tuple:")
 st.markdown(f"Example format for n = {3}: (1, 2, 3)")
 
+# random example, uniform over all classical PF_n
+if st.button("Random example"):
+    st.session_state.classical_example = (n, random_parking_function(n))
+example_n, example = st.session_state.get("classical_example", (None, None))
+if example_n != n:
+    example = tuple(range(1, n + 1))
+
 # single text input
 pref_input = st.text_input(
     label="Enter preferences",
-    value=f"({', '.join(str(i+1) for i in range(n))})"
+    value=f"({', '.join(str(x) for x in example)})"
 )
 
 # parse and validate input and run animation
 if st.button("Generate"):
     try:
-        # convert to tuple of ints
-        cleaned_input = pref_input.replace(" ", "").strip("()").split(",")
-        preferences = tuple(int(x) for x in cleaned_input)
+        with span("parse"):
+            # convert to tuple of ints
+            cleaned_input = pref_input.replace(" ", "").strip("()").split(",")
+            preferences = tuple(int(x) for x in cleaned_input)
         
         # validate length
         if len(preferences) != n:
@@ -80,13 +93,8 @@ if st.button("Generate"):
             parking_func = preferences
             frames = simulate_classical_parking(parking_func)
             
-            placeholder = st.empty()
-            
-            for step in range(len(frames)):
-                fig = plot_parking_state(parking_func, frames[step], step)
-                placeholder.pyplot(fig)
-                plt.close(fig)  
-                time.sleep(1.0)
+            # played in the browser from the simulation trace
+            show_animation("classical", parking_func, frames)
             
             if all((s is not None) for s in frames[-1]):
                 st.success(f"All cars parked. This **is** a valid Classical Parking Function of length {n}!")
@@ -95,3 +103,5 @@ if st.button("Generate"):
     
     except ValueError:
         st.error("Invalid input format. Please enter numbers separated by commas.")
+
+show_panel(trace)
@@ -1,7 +1,9 @@
-from animate import simulate_k_naples_parking, plot_parking_state
+from animate import simulate_k_naples_parking
+from assets import static_image
+from instrument import begin, show_panel, span
+from player import show_animation
+from sampling import random_parking_function
 import streamlit as st
-import matplotlib.pyplot as plt
-import time
 
 # SETUP
 
@@ -12,6 +14,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# timings of this run, for the optional debug panel (?debug=1)
+trace = begin(st.session_state, "k_naples")
+
 # center title
 col1, col2, col3 = st.columns([3, 6, 1])
 
@@ -40,7 +45,7 @@ st.markdown("""
     }
 </style>
 """, unsafe_allow_html=True)
-st.image("imgs/naples.png")
+st.image(static_image("imgs/naples.png"))
 
 # ANIMATE
 
@@ -59,18 +64,26 @@ k = st.selectbox(fr"Select your steps back ($k$)", list(range(1, n)), index=1)
 st.markdown("### Enter the preferences as a tuple:")
 st.markdown(f"Example format for n = 3 and k = 2: (1, 2, 3)")
 
+# random example, uniform over all classical PF_n
+if st.button("Random example"):
+    st.session_state.k_naples_example = (n, random_parking_function(n))
+example_n, example = st.session_state.get("k_naples_example", (None, None))
+if example_n != n:
+    example = tuple(range(1, n + 1))
+
 # single text input
 pref_input = st.text_input(
     label="Enter preferences",
-    value=f"({', '.join(str(i+1) for i in range(n))})"
+    value=f"({', '.join(str(x) for x in example)})"
 )
 
 # parse and validate input and run animation
 if st.button("Generate"):
     try:
-        # convert to tuple of ints
-        cleaned_input = pref_input.replace(" ", "").strip("()").split(",")
-        preferences = tuple(int(x) for x in cleaned_input)
+        with span("parse"):
+            # convert to tuple of ints
+            cleaned_input = pref_input.replace(" ", "").strip("()").split(",")
+            preferences = tuple(int(x) for x in cleaned_input)
         
         # validate length
         if len(preferences) != n:
@@ -83,13 +96,8 @@ if st.button("Generate"):
             parking_func = preferences
             frames = simulate_k_naples_parking(parking_func, k)
             
-            placeholder = st.empty()
-            
-            for step in range(len(frames)):
-                fig = plot_parking_state(parking_func, frames[step], step)
-                placeholder.pyplot(fig)
-                plt.close(fig)  
-                time.sleep(1.0)
+            # played in the browser from the simulation trace
+            show_animation("k_naples", parking_func, frames, k=k)
             
             if all((s is not None) for s in frames[-1]):
                 st.success(f"All cars parked. This **is** a valid {k}-Naples Parking Function of length {n}!")
@@ -98,3 +106,5 @@ if st.button("Generate"):
     
     except ValueError:
         st.error("Invalid input format. Please enter numbers separated by commas.")
+
+show_panel(trace)
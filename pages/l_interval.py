@@ -1,7 +1,8 @@
-from animate import simulate_interval_parking, plot_parking_state
+from animate import simulate_interval_parking
+from assets import static_image
+from instrument import begin, show_panel, span
+from player import show_animation
 import streamlit as st
-import matplotlib.pyplot as plt
-import time
 
 # SETUP
 
@@ -12,6 +13,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# timings of this run, for the optional debug panel (?debug=1)
+trace = begin(st.session_state, "l_interval")
+
 # center title
 col1, col2, col3 = st.columns([3, 6, 1])
 
@@ -39,7 +43,7 @@ st.markdown("""
     }
 </style>
 """, unsafe_allow_html=True)
-st.image("imgs/l_interval.png")
+st.image(static_image("imgs/l_interval.png"))
 
 # input section
 st.write("---")
@@ -63,9 +67,10 @@ beta_input = st.text_input("β preferences", value="(3, 3, 3)")
 
 if st.button("Generate"):
     try:
-        # clean and validate input
-        alpha = tuple(int(x.strip()) for x in alpha_input.strip('()').split(","))
-        beta = tuple(int(x.strip()) for x in beta_input.strip('()').split(","))
+        with span("parse"):
+            # clean and validate input
+            alpha = tuple(int(x.strip()) for x in alpha_input.strip('()').split(","))
+            beta = tuple(int(x.strip()) for x in beta_input.strip('()').split(","))
         
         # validate inputs
         if len(alpha) != n or len(beta) != n:
@@ -77,13 +82,8 @@ if st.button("Generate"):
         else:
             frames = simulate_interval_parking(alpha, beta)
             
-            placeholder = st.empty()
-            
-            for step in range(len(frames)):
-                fig = plot_parking_state(alpha, frames[step], step)
-                placeholder.pyplot(fig)
-                plt.close(fig)
-                time.sleep(1.0)
+            # played in the browser from the simulation trace
+            show_animation("l_interval", alpha, frames, alpha=alpha, beta=beta)
             
             if all(s is not None for s in frames[-1]):
                 st.success(f"All cars parked successfully! This **is** a valid $l$-Interval Parking Function!")
@@ -92,3 +92,5 @@ if st.button("Generate"):
     
     except ValueError:
         st.error("Invalid input format. Please enter numbers separated by commas in parentheses.")
+
+show_panel(trace)
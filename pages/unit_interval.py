@@ -1,7 +1,8 @@
-from animate import simulate_unit_interval_parking, plot_parking_state
+from animate import simulate_unit_interval_parking
+from assets import static_image
+from instrument import begin, show_panel, span
+from player import show_animation
 import streamlit as st
-import matplotlib.pyplot as plt
-import time
 
 # SETUP
 
@@ -12,6 +13,9 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# timings of this run, for the optional debug panel (?debug=1)
+trace = begin(st.session_state, "unit_interval")
+
 # center title
 col1, col2, col3 = st.columns([2, 6, 1])
 
@@ -40,7 +44,7 @@ st.markdown("""
     }
 </style>
 """, unsafe_allow_html=True)
-st.image("imgs/unit.png")
+st.image(static_image("imgs/unit.png"))
 
 # input section
 st.write("---")
@@ -60,8 +64,9 @@ pref_input = st.text_input("Preferences", value="(2, 1, 1)")
 
 if st.button("Generate"):
     try:
-        # clean and validate input
-        preferences = tuple(int(x.strip()) for x in pref_input.strip('()').split(","))
+        with span("parse"):
+            # clean and validate input
+            preferences = tuple(int(x.strip()) for x in pref_input.strip('()').split(","))
         
         # create alpha (preferences) and beta (preferences + 1, except last car)
         alpha = preferences
@@ -76,13 +81,8 @@ if st.button("Generate"):
         else:
             frames = simulate_unit_interval_parking(alpha, beta)
             
-            placeholder = st.empty()
-            
-            for step in range(len(frames)):
-                fig = plot_parking_state(alpha, frames[step], step)
-                placeholder.pyplot(fig)
-                plt.close(fig)
-                time.sleep(1.0)
+            # played in the browser from the simulation trace
+            show_animation("unit_interval", alpha, frames, alpha=alpha, beta=beta)
             
             if all(s is not None for s in frames[-1]):
                 st.success(f"All cars parked successfully! This **is** a valid Unit Interval Parking Function!")
@@ -91,3 +91,5 @@ if st.button("Generate"):
     
     except ValueError:
         st.error("Invalid input format. Please enter numbers separated by commas in parentheses.")
+
+show_panel(trace)
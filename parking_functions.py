@@ -0,0 +1,209 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain, islice
+
+import numpy as np
+
+from batch import MAX_SPOTS, first_fit_step
+
+
+def iter_parking_functions(k, l, m, n, start=None, stop=None):
+    """
+    lazily yields every parking function with k steps back (k-Naples),
+    l steps forward (l-interval), m cars and n spots as a tuple of
+    preferences, in lexicographic order. memory stays O(m) however many
+    there are. start/stop are preference prefixes: output begins at the
+    first tuple >= start and ends before the first tuple >= stop
+    """
+    if m == 0:
+        if (start is None or () >= tuple(start)) and (stop is None or () < tuple(stop)):
+            yield ()
+        return
+
+    start = None if start is None else tuple(start)
+    stop = None if stop is None else tuple(stop)
+
+    street = [0] * (n + 1)  # street[n] stays empty and marks the end
+    preferences, spots = [], []
+    # per depth: next preference value to try, and whether we are still on start's prefix
+    next_value, on_start = [], []
+
+    def push(on_path):
+        depth = len(preferences)
+        if on_path and depth < len(start):
+            next_value.append(start[depth] - 1)
+            on_start.append(True)
+        else:
+            next_value.append(0)
+            on_start.append(False)
+
+    push(start is not None)
+    while next_value:
+        preference_value = next_value[-1]
+        if preference_value >= n:
+            # every value tried at this depth: backtrack
+            next_value.pop()
+            on_start.pop()
+            if preferences:
+                street[spots.pop()] = 0
+                preferences.pop()
+            continue
+        next_value[-1] = preference_value + 1
+
+        spot = park(street, preference_value, k, l, n)
+        if spot is None:
+            continue
+
+        street[spot] = 1
+        spots.append(spot)
+        preferences.append(preference_value + 1)
+
+        if len(preferences) == m:
+            result = tuple(preferences)
+            if stop is not None and result[:len(stop)] >= stop:
+                return
+            yield result
+            street[spots.pop()] = 0
+            preferences.pop()
+        else:
+            depth = len(preferences) - 1
+            push(on_start[-1] and depth < len(start) and preference_value + 1 == start[depth])
+
+
+def park(street, preference_value, max_back_steps, max_forward_steps, total_spots):
+    """
+    0-based spot the next car takes on a street of 0/1 flags, or None if it
+    cannot park within the constraints
+    """
+    spot = preference_value
+    while street[spot] != 0 and preference_value - spot < max_back_steps and spot > 0:
+        spot -= 1  # move backward while occupied and within max_back_steps
+    while street[spot] != 0 and spot - preference_value <= max_forward_steps:
+        spot += 1  # move forward while occupied and within max_forward_steps
+        if spot > total_spots:
+            break
+    if spot >= total_spots or spot - preference_value > max_forward_steps:
+        return None
+    return spot
+
+
+def iter_parking_function_blocks(k, l, m, n, rows, start=None, stop=None):
+    """
+    same stream as iter_parking_functions, as uint8 arrays of up to `rows` rows
+    """
+    preferences = iter_parking_functions(k, l, m, n, start=start, stop=stop)
+    while True:
+        block = list(islice(preferences, rows))
+        if not block:
+            return
+        yield np.array(block, dtype=np.uint8).reshape(len(block), m)
+
+
+def iter_parking_function_arrays(k, l, m, n, max_rows=1 << 20):
+    """
+    same set as iter_parking_functions in the same order, built with NumPy a
+    car at a time over whole blocks of prefixes; yields uint8 arrays, and
+    prefixes are split so no block grows past about max_rows rows
+    """
+    if n > MAX_SPOTS:
+        raise ValueError(f"array enumeration supports at most {MAX_SPOTS} spots")
+    prefixes = np.empty((1, 0), dtype=np.uint8)
+    occupied = np.zeros(1, dtype=np.uint64)
+    yield from _grow(k, l, m, n, prefixes, occupied, max(1, max_rows // max(n, 1)))
+
+
+def _grow(k, l, m, n, prefixes, occupied, step):
+    if prefixes.shape[1] == m:
+        if len(prefixes):
+            yield prefixes
+        return
+    for start in range(0, len(prefixes), step):
+        block, street = prefixes[start:start + step], occupied[start:start + step]
+        # every prefix followed by every preference, kept in lexicographic order
+        parent = np.repeat(np.arange(len(block)), n)
+        preference = np.tile(np.arange(1, n + 1), len(block))
+        spot = first_fit_step(street[parent], preference, preference + l, k, n)
+        parked = spot > 0
+        parent, preference, spot = parent[parked], preference[parked], spot[parked]
+        yield from _grow(
+            k, l, m, n,
+            np.column_stack((block[parent], preference.astype(np.uint8))),
+            street[parent] | (np.uint64(1) << spot.astype(np.uint64)),
+            step,
+        )
+
+
+def parallel_parking_functions(k, l, m, n, workers=None, depth=1, progress=None):
+    """
+    enumerates on a process pool with one shard per valid prefix of `depth`
+    preferences and returns every parking function as a uint8 array in
+    lexicographic order. workers defaults to the number of CPUs;
+    progress(done, total) is called as shards finish
+    """
+    depth = min(depth, m)
+    if depth == 0:
+        shards = [()]
+    else:
+        shards = list(iter_parking_functions(k, l, depth, n))
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_enumerate_shard, k, l, m, n, prefix) for prefix in shards]
+        if progress is not None:
+            for done, _ in enumerate(as_completed(futures), 1):
+                progress(done, len(futures))
+        # shards cover consecutive ranges, so concatenating in order stays sorted
+        blocks = [future.result() for future in futures]
+
+    return np.concatenate(blocks) if blocks else np.empty((0, m), dtype=np.uint8)
+
+
+def _enumerate_shard(k, l, m, n, prefix, max_rows=1 << 20):
+    # the prefix's cars park one at a time, then the NumPy enumerator grows
+    # the shard from that street; streets wider than a uint64 take the slow path
+    if n > MAX_SPOTS:
+        start, stop = (prefix, prefix[:-1] + (prefix[-1] + 1,)) if prefix else (None, None)
+        preferences = iter_parking_functions(k, l, m, n, start=start, stop=stop)
+        if m == 0:
+            return np.empty((sum(1 for _ in preferences), 0), dtype=np.uint8)
+        return np.fromiter(chain.from_iterable(preferences), dtype=np.uint8).reshape(-1, m)
+
+    occupied = np.zeros(1, dtype=np.uint64)
+    for preference in prefix:
+        a = np.array([preference], dtype=np.int64)
+        spot = first_fit_step(occupied, a, a + l, k, n)
+        occupied |= np.uint64(1) << spot.astype(np.uint64)
+    prefixes = np.array([prefix], dtype=np.uint8).reshape(1, len(prefix))
+    blocks = list(_grow(k, l, m, n, prefixes, occupied, max(1, max_rows // max(n, 1))))
+    return np.concatenate(blocks) if blocks else np.empty((0, m), dtype=np.uint8)
+
+
+# list versions with the notebook's names
+
+def k_naples_l_interval_m_cars_n_spots_parking_functions(k, l, m, n):
+    return [list(pf) for pf in iter_parking_functions(k, l, m, n)]
+
+def k_naples_l_interval_parking_functions(k, l, n):  # m = n
+    return k_naples_l_interval_m_cars_n_spots_parking_functions(k, l, n, n)
+
+def l_interval_m_cars_n_spots_parking_functions(l, m, n):  # no k
+    return k_naples_l_interval_m_cars_n_spots_parking_functions(0, l, m, n)
+
+def k_naples_m_cars_n_spots_parking_functions(k, m, n):  # no l
+    return k_naples_l_interval_m_cars_n_spots_parking_functions(k, n, m, n)
+
+def l_interval_parking_functions(l, n):  # no k and m = n
+    return k_naples_l_interval_m_cars_n_spots_parking_functions(0, l, n, n)
+
+def k_naples_parking_functions(k, n):  # no l and m = n
+    return k_naples_l_interval_m_cars_n_spots_parking_functions(k, n, n, n)
+
+def basic_parking_functions(n):  # classical parking functions
+    return k_naples_l_interval_m_cars_n_spots_parking_functions(0, n, n, n)
+
+def basic_parking_functions_with_m_cars_and_n_spots(m, n):  # classical, but m < n
+    return k_naples_l_interval_m_cars_n_spots_parking_functions(0, n, m, n)
+
+def unit_interval_parking_functions(n):  # k = 1, l = 1, and m = n
+    return k_naples_l_interval_m_cars_n_spots_parking_functions(1, 1, n, n)
+
+def one_interval_parking_functions(n):  # no k, l = 1, and m = n
+    return k_naples_l_interval_m_cars_n_spots_parking_functions(0, 1, n, n)
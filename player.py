@@ -0,0 +1,188 @@
+import json
+import os
+
+from animate import CAR_BOTTOM, CAR_HEIGHT, CAR_WIDTH, PARKED_COLOR, car_outline, street_layout
+from animation_cache import FRAME_MS, animation_gif
+from instrument import count, span
+
+# browser-side playback: the server sends the simulation's FrameLog as JSON
+# plus the street geometry, and a small script draws the same frames as
+# StreetRenderer in SVG on its own timer. a page costs one simulation call
+# and a few kB, and no script thread is held while it plays.
+# PF_PLAYBACK=gif switches the pages back to server-rendered GIFs
+
+PLAYBACK = os.environ.get('PF_PLAYBACK', 'client')
+
+# the figure StreetRenderer draws: max(12, 1.5 n) x 4 inches, default
+# subplot margins
+FIGURE_HEIGHT = 4
+AXES_WIDTH, AXES_HEIGHT = 0.775, 0.77
+
+
+def trace(frames, parking_func):
+    """
+    everything the player needs: the events, the preferences and the
+    street's geometry in data units
+    """
+    log = frames.todict()
+    xlim, ylim, spot_start, spot_spacing = street_layout(log['n'])
+    vertices, wheel_centers, wheel_radius, label_position = car_outline(CAR_WIDTH, CAR_HEIGHT)
+    return {
+        **log,
+        'preferences': list(parking_func),
+        'xlim': xlim, 'ylim': ylim, 'spot_start': spot_start, 'spot_spacing': spot_spacing,
+        'car': {
+            'width': CAR_WIDTH, 'bottom': CAR_BOTTOM, 'vertices': vertices,
+            'wheels': wheel_centers, 'wheel_radius': wheel_radius, 'label': label_position,
+        },
+        'color': PARKED_COLOR,
+        'size': axes_size(log['n']),
+    }
+
+
+def player_html(frames, parking_func, frame_ms=FRAME_MS, autoplay=True, run=0):
+    """
+    self-contained HTML that plays a simulation once, one frame per
+    frame_ms, with pause, restart and a step slider. run makes the HTML of
+    each Generate click unique and names the player's root element
+    """
+    data = dict(trace(frames, parking_func), frame_ms=frame_ms, autoplay=autoplay, run=run)
+    return _TEMPLATE.replace('__RUN__', str(int(run))).replace('__DATA__', json.dumps(data, separators=(',', ':')))
+
+
+def axes_size(n):
+    """
+    width and height of StreetRenderer's axes in pixels at 100 dpi
+    """
+    return 100 * AXES_WIDTH * max(12, n*1.5), 100 * AXES_HEIGHT * FIGURE_HEIGHT
+
+
+def show_animation(variant, parking_func, frames, k=None, alpha=None, beta=None):
+    """
+    shows a simulation on the page: played in the browser, or as a cached
+    server-rendered GIF with PF_PLAYBACK=gif
+    """
+    import streamlit as st
+
+    if PLAYBACK == 'gif':
+        with span('animation'):
+            gif = animation_gif(variant, parking_func, frames, k=k, alpha=alpha, beta=beta)
+        with span('display'):
+            st.image(gif)
+        return
+
+    # the player is part of the page, not an iframe: a new run id per call
+    # replaces the previous player (whose timer stops once it is detached),
+    # and the same tuple generated twice plays again from the start
+    run = st.session_state.get('player_run', 0) + 1
+    st.session_state['player_run'] = run
+    with span('animation'):
+        html = player_html(frames, parking_func, run=run)
+    count('trace_bytes', len(html))
+    with span('display'):
+        st.html(html, unsafe_allow_javascript=True)
+
+
+_TEMPLATE = """<div id="pf-player-__RUN__" style="font-family: 'Source Sans Pro', sans-serif; user-select: none;">
+<svg data-part="street" width="100%" style="display: block;"></svg>
+<div style="display: flex; gap: 8px; align-items: center; margin-top: 6px;">
+  <button data-part="play" style="width: 4.5em;">Pause</button>
+  <button data-part="restart">Restart</button>
+  <input data-part="step" type="range" min="0" value="0" style="flex: 1;">
+  <span data-part="caption" style="min-width: 7em; text-align: right; font-size: 14px;"></span>
+</div>
+</div>
+<script>
+// runs in the page itself, so everything stays inside this function and
+// this player's root
+(() => {
+const data = __DATA__;
+const svgNS = 'http://www.w3.org/2000/svg';
+const root = document.getElementById('pf-player-__RUN__');
+const part = name => root.querySelector(`[data-part="${name}"]`);
+const svg = part('street');
+const slider = part('step');
+const play = part('play');
+const caption = part('caption');
+
+// data units to a viewBox the size of StreetRenderer's axes
+const [W, H] = data.size;
+svg.setAttribute('viewBox', `0 0 ${W} ${H}`);
+const X = x => (x - data.xlim[0]) / (data.xlim[1] - data.xlim[0]) * W;
+const Y = y => (data.ylim[1] - y) / (data.ylim[1] - data.ylim[0]) * H;
+const sx = W / (data.xlim[1] - data.xlim[0]), sy = H / (data.ylim[1] - data.ylim[0]);
+
+function el(name, attrs, parent, text) {
+  const node = document.createElementNS(svgNS, name);
+  for (const [key, value] of Object.entries(attrs)) node.setAttribute(key, value);
+  if (text !== undefined) node.textContent = text;
+  parent.appendChild(node);
+  return node;
+}
+
+// the empty street
+for (let spot = 1; spot <= data.n; spot++) {
+  const x = data.spot_start + (spot - 1) * data.spot_spacing;
+  el('rect', {x: X(x - 0.4), y: Y(0.7), width: 0.8 * sx, height: 0.6 * sy,
+              fill: 'lightgray', stroke: 'black', opacity: 0.3}, svg);
+  el('text', {x: X(x), y: Y(0) + 2, 'text-anchor': 'middle', 'dominant-baseline': 'hanging',
+              'font-size': 11}, svg, `Spot ${spot}`);
+}
+
+// one hidden car per event, shown once its frame is reached
+const cars = data.cars.map((car, i) => {
+  const spot = data.spots[i];
+  const left = spot === 0
+    ? data.n + 1.5 - data.car.width / 2
+    : data.spot_start + (spot - 1) * data.spot_spacing - data.car.width / 2;
+  const bottom = data.car.bottom;
+  const group = el('g', {visibility: 'hidden'}, svg);
+  const points = data.car.vertices.map(([x, y]) => `${X(left + x)},${Y(bottom + y)}`).join(' ');
+  el('polygon', {points: points, fill: data.color, stroke: 'black', 'stroke-width': 1}, group);
+  for (const [x, y] of data.car.wheels) {
+    el('ellipse', {cx: X(left + x), cy: Y(bottom + y), rx: data.car.wheel_radius * sx,
+                   ry: data.car.wheel_radius * sy, fill: 'black'}, group);
+  }
+  const label = el('text', {x: X(left + data.car.label[0]), y: Y(bottom + data.car.label[1]),
+                            'text-anchor': 'middle', 'dominant-baseline': 'central',
+                            'font-size': 13, 'font-weight': 'bold'}, group);
+  el('tspan', {'font-style': 'italic'}, label, 'c');
+  el('tspan', {'baseline-shift': 'sub', 'font-size': 9}, label, String(car + 1));
+  return group;
+});
+
+const last = cars.length;
+slider.max = last;
+let step = 0, timer = null;
+
+function show(next) {
+  step = next;
+  cars.forEach((group, i) => group.setAttribute('visibility', i < step ? 'visible' : 'hidden'));
+  slider.value = step;
+  caption.textContent = `step ${step} / ${last}`;
+}
+
+function stop() {
+  clearInterval(timer);
+  timer = null;
+  play.textContent = 'Play';
+}
+
+function start() {
+  if (step >= last) show(0);
+  play.textContent = 'Pause';
+  timer = setInterval(() => {
+    if (!root.isConnected || step >= last) { stop(); return; }
+    show(step + 1);
+  }, data.frame_ms);
+}
+
+play.onclick = () => (timer === null ? start() : stop());
+part('restart').onclick = () => { stop(); show(0); start(); };
+slider.oninput = () => { stop(); show(Number(slider.value)); };
+
+show(0);
+if (data.autoplay) start(); else stop();
+})();
+</script>
+"""
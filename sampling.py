@@ -0,0 +1,101 @@
+import numpy as np
+
+from counting import count_classical
+
+# Pollak's circular argument: with n + 1 spots on a circle every preference
+# tuple in [n + 1]^n parks, leaving exactly one spot empty, and of the n + 1
+# rotations of a tuple exactly one leaves spot n + 1 empty, i.e. is in PF_n.
+
+
+def empty_spot(preferences):
+    """
+    the spot left empty when n cars with these preferences park on a circle
+    of n + 1 spots
+    """
+    n = len(preferences)
+    counts = [0]*(n + 2)
+    for preferred in preferences:
+        counts[preferred] += 1
+
+    # the running surplus of cars over spots is lowest right at the empty spot
+    surplus, lowest, empty = 0, n + 1, None
+    for spot in range(1, n + 2):
+        surplus += counts[spot] - 1
+        if surplus < lowest:
+            lowest, empty = surplus, spot
+    return empty
+
+
+def rotate_to_parking_function(preferences):
+    """
+    the rotation of a tuple in [n + 1]^n that is a parking function
+    """
+    n = len(preferences)
+    shift = n + 1 - empty_spot(preferences)
+    return tuple((preferred - 1 + shift) % (n + 1) + 1 for preferred in preferences)
+
+
+def rank(parking_func):
+    """
+    position of a classical PF_n in 0..(n+1)^(n-1) - 1; two PFs share a
+    rank only if they are rotations of each other, which never happens
+    """
+    n = len(parking_func)
+    if not all(1 <= x <= i + 1 for i, x in enumerate(sorted(parking_func))):
+        raise ValueError(f"{tuple(parking_func)} is not a parking function")
+
+    # digits are the differences to the last car, mod n + 1
+    result = 0
+    for preferred in parking_func[:-1]:
+        result = result*(n + 1) + (preferred - parking_func[-1]) % (n + 1)
+    return result
+
+
+def unrank(index, n):
+    """
+    the PF_n with the given rank
+    """
+    if not 0 <= index < count_classical(n):
+        raise ValueError(f"rank must be between 0 and {count_classical(n) - 1}")
+    if n == 0:
+        return ()
+
+    digits = []
+    for _ in range(n - 1):
+        index, digit = divmod(index, n + 1)
+        digits.append(digit + 1)
+    return rotate_to_parking_function(digits[::-1] + [1])
+
+
+def random_parking_function(n, rng=None):
+    """
+    uniform random classical PF_n in O(n)
+    """
+    rng = np.random.default_rng(rng)
+    return rotate_to_parking_function(rng.integers(1, n + 2, size=n).tolist())
+
+
+def random_parking_functions(n, size, rng=None):
+    """
+    `size` uniform random classical PF_n at once, one per row
+    """
+    rng = np.random.default_rng(rng)
+    preferences = rng.integers(1, n + 2, size=(size, n))
+    return rotate_to_parking_functions(preferences).astype(np.min_scalar_type(n))
+
+
+def rotate_to_parking_functions(preferences):
+    """
+    rotate_to_parking_function for every row of a 2-D array in [n + 1]^n
+    """
+    preferences = np.asarray(preferences, dtype=np.int64)
+    size, n = preferences.shape
+
+    rows = np.repeat(np.arange(size), n)
+    counts = np.bincount(rows*(n + 1) + (preferences.ravel() - 1),
+                         minlength=size*(n + 1)).reshape(size, n + 1)
+    surplus = np.cumsum(counts - 1, axis=1)
+    empty = np.argmin(surplus, axis=1) + 1
+
+    shift = (n + 1 - empty)[:, None]
+    return (preferences - 1 + shift) % (n + 1) + 1
@@ -0,0 +1,170 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+from functools import partial
+from threading import Lock
+
+import numpy as np
+
+from counting import count_parking_functions
+from parking_functions import iter_parking_function_arrays
+from subclasses import CLASSES, members
+
+# enumerated PF sets kept on disk as uint8 .npy files, one row per PF, and
+# loaded back memory-mapped: nothing is copied into the process, and every
+# process reading the same file shares one copy in the page cache
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'parking_functions')
+INDEX = 'index.json'
+
+
+# family -> (the (k, l, m) set it is cut from, for spot count n; membership filter)
+FAMILIES = {
+    'classical': (lambda n: (0, n, n), None),
+    **{name: (lambda n: (0, n, n), partial(members, name=name)) for name in CLASSES},
+}
+
+
+class PFStore:
+    """
+    a directory of enumerated PF sets plus an index.json describing them;
+    load() returns a read-only memmap and builds the file first if missing
+    """
+
+    def __init__(self, root=None, max_rows=1 << 20):
+        self.root = root or os.environ.get('PF_STORE_DIR') or DEFAULT_DIR
+        self.max_rows = max_rows
+        self._lock = Lock()
+
+    def load(self, family, n, k=None, l=None, m=None):
+        """
+        a family's set for n spots: 'parking' takes k, l and m (m defaults
+        to n), the others are the notebook's subclasses of PF_n
+        """
+        family, k, l, m = _resolve(family, n, k, l, m)
+        path = self.path(key(family, n, k, l, m))
+        if not os.path.exists(path):
+            self.build(family, n, k, l, m)
+        return np.load(path, mmap_mode='r')
+
+    def path(self, name):
+        return os.path.join(self.root, f"{name}.npy")
+
+    def index(self):
+        try:
+            with open(os.path.join(self.root, INDEX)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def build(self, family, n, k=None, l=None, m=None):
+        """
+        (re)writes a set; rows are streamed into the file, so a set never has
+        to fit in memory
+        """
+        family, k, l, m = _resolve(family, n, k, l, m)
+        name = key(family, n, k, l, m)
+        started = time.perf_counter()
+        if family == 'parking':
+            rows = count_parking_functions(k, l, m, n)
+            blocks = iter_parking_function_arrays(k, l, m, n, max_rows=self.max_rows)
+        else:
+            superset = self.load('parking', n, *FAMILIES[family][0](n))
+            rows, blocks = _filtered(superset, FAMILIES[family][1], self.max_rows)
+            m = n
+        os.makedirs(self.root, exist_ok=True)
+
+        # write then rename so readers never map half a file
+        path = self.path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint8, shape=(rows, m))
+        filled = 0
+        for block in blocks:
+            out[filled:filled + len(block)] = block
+            filled += len(block)
+        if filled != rows:
+            raise RuntimeError(f"{name}: expected {rows} rows, enumerated {filled}")
+        out.flush()
+        del out
+        os.replace(tmp_path, path)
+
+        self._record(name, {
+            'family': family, 'n': n, 'k': k, 'l': l, 'm': m, 'rows': rows,
+            'bytes': os.path.getsize(path), 'seconds': round(time.perf_counter() - started, 3),
+        })
+        return path
+
+    def remove(self, family, n, k=None, l=None, m=None):
+        name = key(family, n, k, l, m)
+        if os.path.exists(self.path(name)):
+            os.remove(self.path(name))
+        self._record(name, None)
+
+    def _record(self, name, entry):
+        # rewrite the whole index atomically, holding the index lock from the
+        # read to the rename so no other process's entry is lost in between
+        with self._lock, _locked(os.path.join(self.root, INDEX + '.lock')):
+            index = self.index()
+            if entry is None:
+                index.pop(name, None)
+            else:
+                index[name] = entry
+            path = os.path.join(self.root, INDEX)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(index, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, path)
+
+
+@contextmanager
+def _locked(path):
+    """
+    an exclusive flock on path while the block runs; it is released if the
+    process dies. without fcntl (Windows) only the thread lock applies
+    """
+    try:
+        import fcntl
+    except ImportError:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def key(family, n, k=None, l=None, m=None):
+    family, k, l, m = _resolve(family, n, k, l, m)
+    if family == 'parking':
+        return f"parking_k{k}_l{l}_m{m}_n{n}"
+    return f"{family}_n{n}"
+
+
+def _resolve(family, n, k, l, m):
+    # unfiltered families are just a (k, l, m) set under another name
+    if family in FAMILIES and FAMILIES[family][1] is None:
+        family, (k, l, m) = 'parking', FAMILIES[family][0](n)
+    if family == 'parking':
+        return family, k or 0, n if l is None else l, n if m is None else m
+    if family not in FAMILIES:
+        raise ValueError(f"unknown family {family!r}")
+    return family, None, None, None
+
+
+def _filtered(superset, keep, max_rows):
+    # one pass to count, so the output can be sized, and one to copy
+    masks = [keep(superset[start:start + max_rows]) for start in range(0, len(superset), max_rows)]
+    rows = int(sum(mask.sum() for mask in masks))
+
+    def blocks():
+        for i, mask in enumerate(masks):
+            start = i * max_rows
+            yield superset[start:start + len(mask)][mask]
+    return rows, blocks()
+
+
+STORE = PFStore()
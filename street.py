@@ -0,0 +1,205 @@
+import numpy as np
+
+
+class Street:
+    """
+    free spots 1..n of a street; next/previous free spot lookups use
+    union-find with path halving so cars never walk over parked cars.
+    preferences are expected to be >= 1
+    """
+
+    def __init__(self, n):
+        self.n = n
+        # index 0 and n + 1 are sentinels that never get parked in
+        self._next = list(range(n + 2))
+        self._prev = list(range(n + 2))
+
+    def is_free(self, spot):
+        return 1 <= spot <= self.n and self._next[spot] == spot
+
+    def next_free(self, spot):
+        """
+        smallest free spot >= spot; anything > n means the street is full from there
+        """
+        if spot > self.n:
+            return spot
+        nxt = self._next
+        while nxt[spot] != spot:
+            nxt[spot] = nxt[nxt[spot]]
+            spot = nxt[spot]
+        return spot
+
+    def prev_free(self, spot):
+        """
+        largest free spot <= spot; 0 if every spot down to 1 is taken
+        """
+        if spot < 1:
+            return 0
+        prv = self._prev
+        while prv[spot] != spot:
+            prv[spot] = prv[prv[spot]]
+            spot = prv[spot]
+        return spot
+
+    def park(self, spot):
+        self._next[spot] = spot + 1
+        self._prev[spot] = spot - 1
+
+
+class Outcome:
+    """
+    one pass of the parking rule over a preference list. spots and steps
+    use 0-based car indices like the step generators; the statistics use
+    car numbers 1..m, as the notebook does:
+    - valid: every car parked
+    - permutation: car number in each spot 1..n, None for an empty spot
+    - displacement: sum of |spot - preference| over the parked cars
+    - lucky: cars that parked in their preferred spot
+    - first_failure: first car that could not park, None if none did
+    """
+
+    def __init__(self, m, n):
+        self.m, self.n = m, n
+        self.spots = [None]*m
+        self.steps = []
+        self.displacement = 0
+        self.lucky = []
+        self.first_failure = None
+
+    @property
+    def valid(self):
+        return self.first_failure is None and len(self.steps) == self.m
+
+    @property
+    def permutation(self):
+        permutation = [None]*self.n
+        for car, spot in enumerate(self.spots):
+            if spot is not None:
+                permutation[spot - 1] = car + 1
+        return tuple(permutation)
+
+    def __repr__(self):
+        return "Outcome(valid={}, spots={}, displacement={}, lucky={}, first_failure={})".format(
+            self.valid, self.spots, self.displacement, self.lucky, self.first_failure
+        )
+
+
+def parking_outcome(preferences, k=0, l=None, n=None, beta=None, stop=True, two_choice=False):
+    """
+    parks m cars on n spots (n = m by default) in one pass. a car whose
+    preferred spot is taken first looks up to k spots back (k-Naples),
+    then forward to the next free spot, at most l past its preference
+    (l-interval) and at most beta[i] (interval PFs). with two_choice a car
+    tries only a_i and then b_i, nothing in between (unit-interval). with
+    stop, the run ends at the first car that cannot park; otherwise later
+    cars still try
+    """
+    m = len(preferences)
+    n = m if n is None else n
+    street = Street(n)
+    outcome = Outcome(m, n)
+
+    for i, preferred in enumerate(preferences):
+        spot = None
+        if two_choice:
+            if street.is_free(preferred):
+                spot = preferred
+            elif street.is_free(beta[i]):
+                spot = beta[i]
+        elif k and preferred <= n and not street.is_free(preferred):
+            back_spot = street.prev_free(preferred - 1)
+            if back_spot >= max(1, preferred - k):
+                spot = back_spot
+        if spot is None and not two_choice:
+            spot = street.next_free(preferred)
+            last = n
+            if l is not None:
+                last = min(last, preferred + l)
+            if beta is not None:
+                last = min(last, beta[i])
+            if spot > last:
+                spot = None
+
+        outcome.steps.append((i, spot))
+        if spot is None:
+            if outcome.first_failure is None:
+                outcome.first_failure = i + 1
+            if stop:
+                break
+            continue
+
+        street.park(spot)
+        outcome.spots[i] = spot
+        outcome.displacement += abs(spot - preferred)
+        if spot == preferred:
+            outcome.lucky.append(i + 1)
+
+    return outcome
+
+
+def outcome_statistics(pfs, k=0, l=None, n=None):
+    """
+    per-row statistics of a 2-D array of preference lists from one
+    simulation each: name -> int64 array, ready for homomesy.sweep
+    """
+    outcomes = [parking_outcome(pf, k=k, l=l, n=n) for pf in np.asarray(pfs).tolist()]
+    return {
+        'valid': np.array([outcome.valid for outcome in outcomes], dtype=np.int64),
+        'displacement': np.array([outcome.displacement for outcome in outcomes], dtype=np.int64),
+        'lucky': np.array([len(outcome.lucky) for outcome in outcomes], dtype=np.int64),
+        'first_failure': np.array([outcome.first_failure or 0 for outcome in outcomes], dtype=np.int64),
+    }
+
+
+def classical_steps(parking_func):
+    """
+    yields (car, spot) as each car of a classical PF_n parks; spot is None
+    for the car that reaches the end of the street, which ends the run
+    """
+    yield from parking_outcome(parking_func).steps
+
+
+def k_naples_steps(parking_func, k):
+    """
+    yields (car, spot) as each car of a k-Naples PF_n parks
+    """
+    yield from parking_outcome(parking_func, k=k).steps
+
+
+def final_assignment(steps, n):
+    """
+    runs a step generator to the end and returns the last assignment
+    """
+    assignment = [None]*n
+    for car, spot in steps:
+        assignment[car] = spot
+    return assignment
+
+
+def park_classical(parking_func):
+    """
+    final assignment for a classical PF_n without recording frames
+    """
+    return parking_outcome(parking_func).spots
+
+
+def park_k_naples(parking_func, k):
+    """
+    final assignment for a k-Naples PF_n without recording frames
+    """
+    return parking_outcome(parking_func, k=k).spots
+
+
+def interval_steps(alpha, beta):
+    """
+    yields (car, spot) as each car of an l-interval PF_n parks in the first
+    open spot of [a_i, b_i]; later cars still try after one fails
+    """
+    yield from parking_outcome(alpha, beta=beta, stop=False).steps
+
+
+def unit_interval_steps(alpha, beta):
+    """
+    yields (car, spot) as each car of a unit-interval PF_n tries a_i, then b_i
+    """
+    yield from parking_outcome(alpha, beta=beta, two_choice=True).steps
@@ -0,0 +1,93 @@
+import numpy as np
+
+from batch import validate_k_naples_l_interval
+from parking_functions import iter_parking_function_arrays
+
+# membership bits of the notebook's subclasses of classical parking functions
+PRIME = 1
+PICKY = 2
+FUBINI = 4
+PRIMARY = 8
+UNIT_FUBINI = 16
+
+CLASSES = {
+    'prime': PRIME,
+    'picky': PICKY,
+    'fubini': FUBINI,
+    'primary': PRIMARY,
+    'unit_fubini': UNIT_FUBINI,
+}
+
+
+def classify(pfs):
+    """
+    one uint8 of membership bits per row of a 2-D array of classical PFs,
+    from a single sort of every row
+    """
+    pfs = np.asarray(pfs)
+    if pfs.ndim != 2:
+        raise ValueError("expected a 2-D array with one parking function per row")
+    rows, n = pfs.shape
+    bits = np.zeros(rows, dtype=np.uint8)
+    if n == 0:
+        return bits
+
+    sorted_pfs = np.sort(pfs, axis=1)
+    starts_at_one = sorted_pfs[:, 0] == 1
+    steps = np.diff(sorted_pfs, axis=1)
+    tied = steps == 0
+
+    # dropping one 1 leaves a PF of length n - 1
+    prime = starts_at_one & np.all(sorted_pfs[:, 1:] <= np.arange(1, n), axis=1)
+    # the values used are exactly 1..d
+    picky = starts_at_one & np.all(steps <= 1, axis=1)
+    # each tie of t cars at rank r is followed by rank r + t
+    fubini = starts_at_one & np.all(tied | (sorted_pfs[:, 1:] == np.arange(2, n + 1)), axis=1)
+    primary = np.all(pfs <= np.arange(1, n + 1), axis=1)
+
+    # unit interval (one step back, one forward) only needs checking on Fubini rankings
+    unit_fubini = fubini.copy()
+    if fubini.any():
+        unit_fubini[fubini] = validate_k_naples_l_interval(pfs[fubini], 1, 1, spots=False)[0]
+
+    for mask, bit in ((prime, PRIME), (picky, PICKY), (fubini, FUBINI),
+                      (primary, PRIMARY), (unit_fubini, UNIT_FUBINI)):
+        bits |= np.where(mask, bit, 0).astype(np.uint8)
+    return bits
+
+
+def members(pfs, name):
+    """
+    boolean mask of the rows in one subclass
+    """
+    return (classify(pfs) & CLASSES[name]) != 0
+
+
+def select(pfs, name):
+    return np.asarray(pfs)[members(pfs, name)]
+
+
+# list versions with the notebook's names
+
+def are_prime(pfs, n):
+    return _filter(pfs, 'prime')
+
+def are_picky(pfs):
+    return _filter(pfs, 'picky')
+
+def are_fubini_rankings(pfset):
+    return _filter(pfset, 'fubini')
+
+def is_primary(pfset):
+    return _filter(pfset, 'primary')
+
+def generate_unit_fubini(n):
+    return [list(pf) for block in iter_parking_function_arrays(0, n, n, n) for pf in select(block, 'unit_fubini').tolist()]
+
+
+def _filter(pfs, name):
+    pfs = [list(pf) for pf in pfs]
+    if not pfs:
+        return []
+    keep = members(np.array(pfs), name)
+    return [pf for pf, kept in zip(pfs, keep) if kept]
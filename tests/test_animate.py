@@ -0,0 +1,27 @@
+import numpy as np
+
+from animate import StripRenderer
+
+
+def _parked(renderer):
+    return np.flatnonzero(~np.isnan(renderer._strip[0])).tolist()
+
+
+def test_strip_steps_forward_and_back():
+    renderer = StripRenderer([1] * 40)
+    assignment = list(range(1, 41))
+    for step in range(1, 6):
+        renderer.update(assignment, step)
+    assert _parked(renderer) == [0, 1, 2, 3, 4]
+    renderer.update(assignment, 2)
+    assert _parked(renderer) == [0, 1]
+
+
+def test_strip_redraws_another_simulation_at_the_same_step():
+    renderer = StripRenderer([1] * 40)
+    renderer.update(list(range(1, 41)), 3)
+    renderer.update(list(range(40, 0, -1)), 3)
+    assert _parked(renderer) == [37, 38, 39]
+    # and stepping on from the new one only adds its next car
+    renderer.update(list(range(40, 0, -1)), 4)
+    assert _parked(renderer) == [36, 37, 38, 39]
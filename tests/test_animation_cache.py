@@ -0,0 +1,15 @@
+import animation_cache
+from animation_cache import cache_key
+
+
+def test_cache_key_depends_on_inputs():
+    key = cache_key('classical', (1, 1, 2))
+    assert key == cache_key('classical', [1, 1, 2])
+    assert key != cache_key('classical', (1, 2, 1))
+    assert key != cache_key('k_naples', (1, 1, 2), k=1)
+
+
+def test_cache_key_changes_with_the_render_version(monkeypatch):
+    key = cache_key('classical', (1, 1, 2))
+    monkeypatch.setattr(animation_cache, 'RENDER_VERSION', animation_cache.RENDER_VERSION + 1)
+    assert cache_key('classical', (1, 1, 2)) != key
@@ -0,0 +1,57 @@
+import numpy as np
+
+from batch import validate_classical, validate_interval, validate_k_naples, validate_k_naples_l_interval
+from street import parking_outcome
+
+
+def _spots(outcome):
+    return [spot or 0 for spot in outcome.spots]
+
+
+def test_classical_matches_simulator():
+    rng = np.random.default_rng(1)
+    for n in range(1, 8):
+        prefs = rng.integers(1, n + 1, (300, n))
+        valid, spots = validate_classical(prefs)
+        for row in range(len(prefs)):
+            outcome = parking_outcome(prefs[row].tolist())
+            assert outcome.valid == valid[row]
+            assert _spots(outcome) == spots[row].tolist()
+
+
+def test_k_naples_matches_simulator():
+    rng = np.random.default_rng(2)
+    for n in range(1, 8):
+        prefs = rng.integers(1, n + 1, (100, n))
+        for k in range(n):
+            valid, spots = validate_k_naples(prefs, k)
+            for row in range(len(prefs)):
+                outcome = parking_outcome(prefs[row].tolist(), k=k)
+                assert outcome.valid == valid[row]
+                assert _spots(outcome) == spots[row].tolist()
+
+
+def test_k_naples_l_interval_matches_simulator():
+    rng = np.random.default_rng(3)
+    for n in range(1, 7):
+        prefs = rng.integers(1, n + 1, (100, n))
+        for k in range(n):
+            for l in range(n):
+                valid, spots = validate_k_naples_l_interval(prefs, k, l)
+                for row in range(len(prefs)):
+                    outcome = parking_outcome(prefs[row].tolist(), k=k, l=l)
+                    assert outcome.valid == valid[row]
+                    assert _spots(outcome) == spots[row].tolist()
+
+
+def test_interval_matches_simulator():
+    rng = np.random.default_rng(4)
+    for n in range(1, 8):
+        alpha = rng.integers(1, n + 1, (300, n))
+        # b_i < a_i is an empty interval
+        beta = rng.integers(1, n + 1, (300, n))
+        valid, spots = validate_interval(alpha, beta)
+        for row in range(len(alpha)):
+            outcome = parking_outcome(alpha[row].tolist(), beta=beta[row].tolist(), stop=False)
+            assert all(spot is not None for spot in outcome.spots) == valid[row]
+            assert _spots(outcome) == spots[row].tolist()
@@ -0,0 +1,67 @@
+import io
+
+import numpy as np
+import pytest
+
+from bulk import read_preferences, results_csv, results_frame, validate
+
+
+def test_read_text_and_npy():
+    text = b"p1,p2,p3\n1,1,2\n(2, 1, 1)\n\n[3 3 1]\n"
+    assert read_preferences(text, 'prefs.csv').tolist() == [[1, 1, 2], [2, 1, 1], [3, 3, 1]]
+    buffer = io.BytesIO()
+    np.save(buffer, np.array([[1, 2], [2, 2]], dtype=np.uint8))
+    assert read_preferences(buffer.getvalue(), 'prefs.npy').tolist() == [[1, 2], [2, 2]]
+
+
+def test_read_errors():
+    with pytest.raises(ValueError):
+        read_preferences(b"1,2\n1,2,3\n", 'prefs.txt')
+    with pytest.raises(ValueError):
+        read_preferences(b"1,2\nx,y\n", 'prefs.txt')
+    with pytest.raises(ValueError):
+        read_preferences(b"header only\n", 'prefs.txt')
+
+
+def test_validate_variants():
+    valid, spots, failing = validate('classical', np.array([[1, 1, 2], [3, 3, 1]]))
+    assert valid.tolist() == [True, False]
+    assert spots.tolist() == [[1, 2, 3], [3, 0, 0]]
+    assert failing.tolist() == [0, 2]
+
+    valid, spots, failing = validate('k_naples', np.array([[3, 3, 1]]), k=1)
+    assert valid.tolist() == [True] and spots.tolist() == [[3, 2, 1]]
+
+    # α then β; b_i < a_i is an empty interval
+    valid, spots, failing = validate('l_interval', np.array([[1, 1, 3, 3], [2, 1, 1, 2]]))
+    assert valid.tolist() == [True, False]
+    assert spots.tolist() == [[1, 2], [0, 1]]
+    assert failing.tolist() == [0, 1]
+
+    with pytest.raises(ValueError):
+        validate('l_interval', np.array([[1, 1, 1]]))
+    with pytest.raises(ValueError):
+        validate('k_naples', np.array([[1]]))
+
+
+def test_results_csv():
+    prefs = np.array([[1, 1, 3, 3], [2, 1, 1, 2]])
+    data = results_csv(prefs, *validate('l_interval', prefs), chunk_rows=1)
+    assert data.decode().splitlines() == [
+        "a1,a2,b1,b2,valid,failing_car,spot1,spot2",
+        "1,1,3,3,1,0,1,2",
+        "2,1,1,2,0,1,0,1",
+    ]
+    prefs = np.array([[1, 1], [2, 2]])
+    assert results_csv(prefs, *validate('classical', prefs)).decode().splitlines()[0] == "p1,p2,valid,failing_car,spot1,spot2"
+
+
+def test_results_frame():
+    prefs = np.array([[1, 1, 3, 3], [2, 1, 1, 2]])
+    frame = results_frame(prefs, *validate('l_interval', prefs))
+    assert frame['preferences'].tolist() == ['(1, 1, 3, 3)', '(2, 1, 1, 2)']
+    assert str(frame['failing car'].dtype) == 'Int64'
+    assert frame['failing car'].isna().tolist() == [True, False]
+    assert frame['failing car'][1] == 1
+    assert frame['spots'].tolist() == ['(1, 2)', '(-, 1)']
+    assert len(results_frame(prefs, *validate('l_interval', prefs), start=1, stop=5)) == 1
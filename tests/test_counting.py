@@ -0,0 +1,17 @@
+from counting import FAMILIES, check_counts, count
+
+
+def test_counts_match_brute_force():
+    assert check_counts(6) == []
+
+
+def test_empty_word():
+    for family in ('classical', 'prime'):
+        assert count(family, 0) == 1
+        assert isinstance(count(family, 0), int)
+
+
+def test_counts_are_ints():
+    for family in FAMILIES:
+        for n in range(1, 8):
+            assert isinstance(count(family, n), int)
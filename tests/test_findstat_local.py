@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from findstat_local import MAPS, STATISTICS, bijections, conformance, findmap, reference_from_notebook, use_fallback
+from parking_functions import iter_parking_functions
+
+
+def _is_pf(pf):
+    return all(value <= i + 1 for i, value in enumerate(sorted(pf)))
+
+
+def _complement(pf):
+    # n + 1 - a_i, shifted mod n + 1 until it is a PF again
+    n = len(pf)
+    for shift in range(n + 1):
+        word = tuple((n - value + shift) % (n + 1) + 1 for value in pf)
+        if _is_pf(word):
+            return word
+
+
+# one PF at a time, written from the maps' definitions
+DEFINITIONS = {
+    293: lambda pf: pf[1:] + pf[:1],
+    303: _complement,
+    304: lambda pf: pf[-1:] + pf[:-1],
+    320: lambda pf: pf[::-1],
+    52: lambda pf: tuple(sorted(pf)),
+}
+
+
+def test_kernels_match_the_notebook():
+    assert conformance() == []
+
+
+def test_conformance_reports_a_wrong_kernel(monkeypatch):
+    monkeypatch.setitem(MAPS, 320, MAPS[320]._replace(kernel=MAPS[293].kernel))
+    monkeypatch.setitem(STATISTICS, 1903, STATISTICS[1903]._replace(kernel=STATISTICS[135].kernel))
+    ids = {id for id, *_ in conformance()}
+    assert {320, 1903} <= ids
+
+
+def test_statistics_are_checked_per_pf():
+    _, _, values = reference_from_notebook()
+    assert sum(len(recorded) for recorded in values.values()) > 1000
+
+
+def test_maps_match_their_definitions():
+    for n in range(1, 6):
+        pfs = list(iter_parking_functions(0, n, n, n))
+        for id, definition in DEFINITIONS.items():
+            got = MAPS[id].kernel(np.array(pfs))
+            assert [tuple(row) for row in got.tolist()] == [definition(pf) for pf in pfs]
+
+
+def test_bijections_permute_pf_n():
+    assert set(bijections()) == {id for id, entry in MAPS.items() if entry.bijective and entry.kernel is not None}
+    for n in range(1, 6):
+        pfs = np.array(list(iter_parking_functions(0, n, n, n)))
+        for id, kernel in bijections().items():
+            images = kernel(pfs)
+            assert sorted(map(tuple, images.tolist())) == sorted(map(tuple, pfs.tolist())), id
+
+
+def test_maps_without_a_kernel_use_the_fallback():
+    assert all(MAPS[id].kernel is None for id in (298, 299, 300, 301))
+    with pytest.raises(ValueError):
+        findmap(298)
+    use_fallback(findmap=lambda id: lambda pf: pf[::-1])
+    try:
+        assert findmap(298)([1, 2, 1]) == [1, 2, 1]
+        assert findmap(299)(np.array([[1, 1, 2]])).tolist() == [[2, 1, 1]]
+    finally:
+        use_fallback()
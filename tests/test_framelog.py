@@ -0,0 +1,47 @@
+import pytest
+
+from framelog import FrameLog
+
+
+def _frames(steps, n):
+    # every assignment, copied after each step
+    assignment = [None]*n
+    frames = [assignment[:]]
+    for car, spot in steps:
+        assignment[car] = spot
+        frames.append(assignment[:])
+    return frames
+
+
+STEPS = [(0, 2), (1, 3), (2, 1), (3, None)]
+
+
+def test_frames_match_full_copies():
+    log = FrameLog.from_steps(STEPS, 4)
+    expected = _frames(STEPS, 4)
+    assert len(log) == len(expected)
+    assert list(log) == expected
+    assert [log.frame(step) for step in range(len(log))] == expected
+
+
+def test_seek():
+    log = FrameLog.from_steps(STEPS, 4)
+    assert log[0] == [None]*4
+    assert log[2] == [2, 3, None, None]
+    assert log[-1] == [2, 3, 1, None]
+    assert list(log.events()) == STEPS
+    with pytest.raises(IndexError):
+        log[len(log)]
+    with pytest.raises(IndexError):
+        log[-len(log) - 1]
+
+
+def test_round_trips():
+    log = FrameLog.from_steps(STEPS, 4)
+    for copy in (FrameLog.frombytes(log.tobytes()), FrameLog.fromjson(log.tojson())):
+        assert copy.n == 4
+        assert list(copy.events()) == STEPS
+        assert list(copy) == list(log)
+    empty = FrameLog(3)
+    assert list(FrameLog.frombytes(empty.tobytes())) == [[None]*3]
+    assert list(FrameLog.fromjson(empty.tojson())) == [[None]*3]
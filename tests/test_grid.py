@@ -0,0 +1,46 @@
+import pytest
+
+import grid
+
+
+def test_second_run_resumes_with_nothing_to_do(tmp_path):
+    options = dict(
+        families=('classical', 'prime'), ns=range(1, 4), maps=[293, 320], stats=[165, 1903],
+        workers=1, path=str(tmp_path / 'grid.sqlite'), store_root=str(tmp_path / 'store'),
+    )
+    done, failed = grid.run(**options)
+    assert (done, failed) == (12, 0)
+    assert grid.run(**options) == (0, 0)
+
+    rows = grid.report(options['path'])
+    assert len(rows) == 24
+    homomesic = {(family, n, map_id, stat) for family, n, map_id, stat, _, homomesic in rows if homomesic}
+    assert ('classical', 3, 293, 1903) in homomesic
+    assert ('classical', 3, 293, 165) not in homomesic
+
+
+def test_more_statistics_only_run_what_is_missing(tmp_path):
+    options = dict(families=('classical',), ns=range(1, 3), maps=[293], workers=1,
+                   path=str(tmp_path / 'grid.sqlite'), store_root=str(tmp_path / 'store'))
+    assert grid.run(stats=[165], **options) == (2, 0)
+    assert grid.run(stats=[165, 1903], **options) == (2, 0)
+    assert grid.run(stats=[165, 1903], **options) == (0, 0)
+
+
+def test_unknown_ids_are_rejected_up_front(tmp_path):
+    path = str(tmp_path / 'grid.sqlite')
+    with pytest.raises(ValueError):
+        grid.run(maps=[298], path=path)
+    with pytest.raises(ValueError):
+        grid.run(maps=[293], stats=[1], path=path)
+    with pytest.raises(ValueError):
+        grid.run(families=('nope',), maps=[293], path=path)
+    assert grid.report(path) == []
+
+
+def test_friendship_sets_are_one_per_graph():
+    tasks = grid.expand(('friendship',), [3], [293])
+    assert [family for family, *_ in tasks] == sorted(
+        (f"friendship:{graph}" for graph in range(1, 8)),
+        key=lambda name: (grid._size(name, 3), name),
+    )
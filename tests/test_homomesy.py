@@ -0,0 +1,68 @@
+from fractions import Fraction
+
+import numpy as np
+
+from homomesy import check, evaluate, find_counterexample, homomesic_pairs
+from orbits import orbit_decomposition
+from parking_functions import iter_parking_functions
+
+
+def _rotate(pfs):
+    # Mp00293, rotate front-to-back
+    return np.roll(pfs, -1, axis=1)
+
+
+def _fixed_points(pfs):
+    # St001903
+    return (pfs == np.arange(1, pfs.shape[1] + 1)).sum(axis=1)
+
+
+def _entry_sum(pfs):
+    return pfs.sum(axis=1)
+
+
+def _classical(n):
+    return np.array(list(iter_parking_functions(0, n, n, n)))
+
+
+def test_fixed_points_are_homomesic_under_rotation():
+    pfs = _classical(4)
+    orbits = orbit_decomposition(pfs, _rotate)
+    values = evaluate(_fixed_points, pfs)
+    assert check(pfs, orbits, values) is None
+    # every orbit averages exactly 1
+    assert set(Fraction(int(total), int(length)) for total, length in zip(orbits.sums(values), orbits.lengths)) == {1}
+
+
+def test_certificate_for_a_non_homomesic_pair():
+    pfs = _classical(4)
+    orbits = orbit_decomposition(pfs, _rotate)
+    certificate = check(pfs, orbits, evaluate(_entry_sum, pfs))
+    assert certificate is not None
+    assert certificate.averages[0] != certificate.averages[1]
+    for orbit, values in zip(certificate.orbits, certificate.values):
+        assert values == [sum(pf) for pf in orbit]
+
+    args = certificate.disproof_args(293, 165, 'rotate', 'sum')
+    assert len(args) == 15
+    assert args[:5] == (293, 165, 'rotate', 'sum', 4)
+    assert args[5] == certificate.orbits[0][0] and args[6] == certificate.orbits[1][0]
+    # then (numerator, orbit length, average) for each orbit
+    assert args[10] == len(certificate.values[0]) and args[13] == len(certificate.values[1])
+    assert args[11] == float(certificate.averages[0]) and args[14] == float(certificate.averages[1])
+
+
+def test_by_length_only_compares_equal_lengths():
+    pfs = _classical(3)
+    orbits = orbit_decomposition(pfs, _rotate)
+    # orbit length itself differs between orbits, but never within a length
+    lengths = np.empty(len(pfs), dtype=np.int64)
+    for orbit in orbits:
+        lengths[orbit] = len(orbit)
+    assert find_counterexample(orbits, lengths) is not None
+    assert find_counterexample(orbits, lengths, by_length=True) is None
+
+
+def test_homomesic_pairs():
+    pairs = homomesic_pairs(_classical(4), {293: _rotate}, {1903: _fixed_points, 165: _entry_sum})
+    assert pairs == [(293, 1903)]
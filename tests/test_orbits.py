@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from orbits import Orbits, cycles, encode, index_map, orbit_decomposition
+from parking_functions import iter_parking_functions
+
+
+def _rotate(pfs):
+    return np.roll(pfs, -1, axis=1)
+
+
+def _pfs(n):
+    return np.array(list(iter_parking_functions(0, n, n, n)))
+
+
+def test_rotation_orbits():
+    for n in range(1, 6):
+        pfs = _pfs(n)
+        orbits = orbit_decomposition(pfs, _rotate)
+        assert orbits.offsets[0] == 0 and orbits.offsets[-1] == len(pfs)
+        assert np.all(np.diff(orbits.offsets) > 0)
+        assert sorted(orbits.indices.tolist()) == list(range(len(pfs)))
+        assert all(n % length == 0 for length in orbits.lengths.tolist())
+        for orbit in orbits:
+            # listed x, f(x), f(f(x)), ... and closed
+            members = pfs[orbit]
+            assert np.array_equal(_rotate(members), np.roll(members, -1, axis=0))
+
+
+def test_sums_and_restrict():
+    orbits = Orbits([0, 2, 3, 6], [0, 1, 2, 3, 4, 5])
+    assert orbits.sums(np.array([1, 2, 3, 4, 5, 6])).tolist() == [3, 3, 15]
+    kept = orbits.restrict(np.array([False, False, True, True, False, True]))
+    assert kept.offsets.tolist() == [0, 1, 3]
+    assert kept.indices.tolist() == [2, 3, 5]
+
+
+def test_encode_keeps_lexicographic_order():
+    pfs = _pfs(4)
+    keys = encode(pfs)
+    assert np.all(np.diff(keys) > 0)
+
+
+def test_errors():
+    pfs = _pfs(3)
+    with pytest.raises(ValueError):
+        # (1, 1, 2) rotates to (1, 2, 1), which is not in the set
+        index_map(np.array([[1, 1, 2]]), _rotate(np.array([[1, 1, 2]])))
+    with pytest.raises(ValueError):
+        orbit_decomposition(pfs, lambda pfs: np.sort(pfs, axis=1))
+    with pytest.raises(ValueError):
+        cycles([1, 1, 0])
@@ -0,0 +1,22 @@
+import pytest
+
+from counting import count_classical
+from parking_functions import iter_parking_functions
+from sampling import rank, unrank
+
+
+def test_unrank_inverts_rank():
+    for n in range(0, 6):
+        ranks = set()
+        for pf in iter_parking_functions(0, n, n, n):
+            index = rank(pf)
+            ranks.add(index)
+            assert tuple(unrank(index, n)) == tuple(pf)
+        assert ranks == set(range(count_classical(n)))
+
+
+def test_rank_rejects_non_parking_functions():
+    with pytest.raises(ValueError):
+        rank((2, 2))
+    with pytest.raises(ValueError):
+        unrank(count_classical(3), 3)
@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pytest
+
+from counting import count
+from parking_functions import iter_parking_functions
+from store import PFStore, key
+
+
+def test_build_and_load(tmp_path):
+    store = PFStore(str(tmp_path), max_rows=7)
+    pfs = store.load('classical', 4)
+    assert isinstance(pfs, np.memmap) and not pfs.flags.writeable
+    assert pfs.dtype == np.uint8
+    assert [tuple(row) for row in pfs.tolist()] == list(iter_parking_functions(0, 4, 4, 4))
+
+    prime = store.load('prime', 4)
+    assert len(prime) == count('prime', 4)
+    index = store.index()
+    assert index[key('classical', 4)]['rows'] == count('classical', 4)
+    assert index[key('prime', 4)]['rows'] == count('prime', 4)
+
+
+def test_parking_sets_take_k_l_m(tmp_path):
+    store = PFStore(str(tmp_path))
+    pfs = store.load('parking', 5, k=1, l=2, m=3)
+    assert [tuple(row) for row in pfs.tolist()] == list(iter_parking_functions(1, 2, 3, 5))
+    with pytest.raises(ValueError):
+        store.load('no such family', 3)
+
+
+def test_rebuild_is_atomic(tmp_path):
+    store = PFStore(str(tmp_path))
+    before = store.load('classical', 3)
+    expected = before.copy()
+    path = store.build('classical', 3)
+    # a reader of the old file keeps its data, the new file is complete
+    assert np.array_equal(before, expected)
+    assert np.array_equal(np.load(path, mmap_mode='r'), expected)
+    assert not [name for name in os.listdir(tmp_path) if 'tmp' in name]
+
+
+def test_remove(tmp_path):
+    store = PFStore(str(tmp_path))
+    store.load('classical', 2)
+    store.remove('classical', 2)
+    assert key('classical', 2) not in store.index()
+    assert not os.path.exists(store.path(key('classical', 2)))
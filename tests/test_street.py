@@ -0,0 +1,97 @@
+from itertools import product
+
+import numpy as np
+
+from animate import simulate_classical_parking, simulate_k_naples_parking
+from batch import validate_unit_interval
+from street import Street, final_assignment, unit_interval_steps
+
+
+def _baseline_classical(parking_func):
+    # the original O(n^2) loop
+    n = len(parking_func)
+    frames, assignment, used_spots = [], [None]*n, set()
+    frames.append(assignment[:])
+    for i, preferred in enumerate(parking_func):
+        spot = preferred
+        while spot in used_spots and spot <= n:
+            spot += 1
+        if spot > n:
+            assignment[i] = None
+            frames.append(assignment[:])
+            break
+        used_spots.add(spot)
+        assignment[i] = spot
+        frames.append(assignment[:])
+    return frames
+
+
+def _baseline_k_naples(parking_func, k):
+    n = len(parking_func)
+    frames, assignment, used_spots = [], [None]*n, set()
+    frames.append(assignment[:])
+    for i, preferred in enumerate(parking_func):
+        spot = preferred
+        if spot in used_spots:
+            for back_spot in range(spot - 1, max(0, spot - k - 1), -1):
+                if back_spot not in used_spots:
+                    spot = back_spot
+                    break
+            if spot in used_spots:
+                spot = preferred
+                while spot in used_spots and spot <= n:
+                    spot += 1
+        if spot > n:
+            assignment[i] = None
+            frames.append(assignment[:])
+            break
+        used_spots.add(spot)
+        assignment[i] = spot
+        frames.append(assignment[:])
+    return frames
+
+
+def test_street_finds_free_spots_like_a_scan():
+    rng = np.random.default_rng(5)
+    n = 30
+    street, taken = Street(n), set()
+    for spot in rng.permutation(np.arange(1, n + 1)).tolist():
+        for query in range(1, n + 1):
+            assert street.next_free(query) == min([s for s in range(query, n + 1) if s not in taken] + [n + 1])
+            assert street.prev_free(query) == max([s for s in range(1, query + 1) if s not in taken] + [0])
+            assert street.is_free(query) == (query not in taken)
+        street.park(spot)
+        taken.add(spot)
+
+
+def test_classical_matches_baseline_loop():
+    for n in range(1, 6):
+        for pf in product(range(1, n + 1), repeat=n):
+            assert list(simulate_classical_parking(list(pf))) == _baseline_classical(list(pf))
+
+
+def test_k_naples_matches_baseline_loop():
+    for n in range(1, 5):
+        for pf in product(range(1, n + 1), repeat=n):
+            for k in range(n + 1):
+                assert list(simulate_k_naples_parking(list(pf), k)) == _baseline_k_naples(list(pf), k)
+
+
+def _assignment(steps, n):
+    return [spot or 0 for spot in final_assignment(steps, n)]
+
+
+def test_unit_interval_tries_only_a_then_b():
+    assert _assignment(unit_interval_steps((1, 1, 1), (1, 3, 3)), 3) == [1, 3, 0]
+
+
+def test_unit_interval_matches_batch_validator():
+    rng = np.random.default_rng(0)
+    for n in range(1, 8):
+        alpha = rng.integers(1, n + 1, (300, n))
+        beta = rng.integers(1, n + 2, (300, n))
+        valid, spots = validate_unit_interval(alpha, beta)
+        for row in range(len(alpha)):
+            steps = list(unit_interval_steps(alpha[row].tolist(), beta[row].tolist()))
+            assert _assignment(steps, n) == spots[row].tolist()
+            assert (len(steps) == n and all(spot is not None for _, spot in steps)) == valid[row]
@@ -0,0 +1,63 @@
+import numpy as np
+
+from parking_functions import iter_parking_functions
+from subclasses import CLASSES, classify, members
+
+
+# the notebook's filters, one PF at a time
+
+def _is_classical(pf):
+    return all(value <= i + 1 for i, value in enumerate(sorted(pf)))
+
+
+def _is_prime(pf):
+    pf = list(pf)
+    if 1 not in pf:
+        return False
+    del pf[pf.index(1)]
+    return _is_classical(pf)
+
+
+def _is_picky(pf):
+    distinct_ranks = sorted(set(pf))
+    return distinct_ranks == list(range(1, len(distinct_ranks) + 1)) and all(1 <= x <= len(pf) for x in pf)
+
+
+def _is_fubini(pf):
+    sorted_pf = sorted(pf)
+    current_value, count = sorted_pf[0], 0
+    if current_value != 1:
+        return False
+    for value in sorted_pf:
+        if value == current_value:
+            count += 1
+        else:
+            if value != current_value + count:
+                return False
+            current_value, count = value, 1
+    return True
+
+
+def _is_primary(pf):
+    return all(car <= i + 1 for i, car in enumerate(pf))
+
+
+def test_classify_matches_the_notebook():
+    for n in range(1, 6):
+        pfs = list(iter_parking_functions(0, n, n, n))
+        unit = set(iter_parking_functions(1, 1, n, n))
+        expected = {
+            'prime': [_is_prime(pf) for pf in pfs],
+            'picky': [_is_picky(pf) for pf in pfs],
+            'fubini': [_is_fubini(pf) for pf in pfs],
+            'primary': [_is_primary(pf) for pf in pfs],
+            'unit_fubini': [_is_fubini(pf) and pf in unit for pf in pfs],
+        }
+        bits = classify(np.array(pfs))
+        for name, bit in CLASSES.items():
+            assert ((bits & bit) != 0).tolist() == expected[name], (name, n)
+            assert members(np.array(pfs), name).tolist() == expected[name]
+
+
+def test_classify_empty_rows():
+    assert classify(np.empty((3, 0), dtype=np.uint8)).tolist() == [0, 0, 0]